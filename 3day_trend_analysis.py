@@ -5,10 +5,10 @@
 
 import json
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 import numpy as np
 
+from chart_pipeline import get_pyplot, save_figure
+
 # Get 72-hour moisture data (simplified from the full dataset)
 # Sampling key points to show the trend
 data_72h = [
@@ -33,6 +33,9 @@ timestamps = [datetime.fromisoformat(d[0].replace('Z', '+00:00')) for d in data_
 moisture = [d[1] for d in data_72h]
 
 # Create figure with 2 subplots
+plt = get_pyplot()
+import matplotlib.dates as mdates
+
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 10))
 
 # Top plot: Full 72-hour trend
@@ -91,7 +94,7 @@ ax2.xaxis.set_major_locator(mdates.HourLocator(interval=12))
 plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
 
 plt.tight_layout()
-plt.savefig('/home/gardener/workspace/3day_moisture_trend.png', dpi=150, bbox_inches='tight')
+save_figure(fig, '/home/gardener/workspace/3day_moisture_trend.png')
 print("✓ Saved: 3day_moisture_trend.png")
 
 # Print summary statistics
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the analysis, parsing, charting and planning code.
+
+synthetic_history() builds a reading history of any length from
+MoistureSimulator (drying between waterings, dawn watering steps, the ~76 min
+oscillation plus jitter, and the daily light sessions), at one reading per
+minute. Each benchmark is timed against histories of 1k, 100k and 10M
+readings; the results are appended to a JSON file together with the git
+commit, so a run can be compared with the previous one and regressions
+show up as ratios. The 10M tier keeps ~10M Python tuples alive (the format
+the analyzers take), so it needs about 4 GB of RAM.
+
+Benchmarks:
+- analyze_trend         MoistureTrendAnalyzer.analyze_trend
+- analyze_moisture      moisture_analysis.analyze_moisture_trend
+- text_chart            visualize_moisture.text_chart (output discarded)
+- parse_timestamps      readings.parse_timestamps on the ISO strings
+- rollup_daily_state    DailyStateStore ingest (in-memory SQLite), one upsert per reading
+- rollup_light          LightHistoryIndex build + per-day compliance over the history
+- plan_days             photoperiod_planner.plan_days over the history's days
+
+Usage:
+    python benchmarks.py [--sizes 1000,100000] [--only name,...] [--out results.json] [--full]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+SIZES = (1_000, 100_000, 10_000_000)
+RESULTS_FILE = "benchmark_results.json"
+MIN_SAMPLE_SECONDS = 0.01  # fast cases are looped so one sample lasts this long
+MIN_SECONDS = 0.2          # take samples until a case has run this long...
+MAX_REPEATS = 20           # ...or this many samples
+REGRESSION_RATIO = 1.25
+
+
+def synthetic_history(readings: int, seed: int = 0) -> Dict:
+    """
+    Synthetic plant history with `readings` one-minute moisture readings
+
+    Returns:
+        dict with readings ([(iso, value), ...]), timestamps (ISO strings),
+        times (datetime64[s]), values (int32), light_intervals
+        ([(start_epoch, end_epoch), ...]) and days
+    """
+    from moisture_simulator import MoistureSimulator, MINUTES_PER_DAY
+
+    days = -(-readings // MINUTES_PER_DAY)
+    result = MoistureSimulator().simulate(days=days, step_minutes=1, seed=seed)
+    times = result.timestamps[:readings]
+    values = result.values[0, :readings]
+    stamps = result.iso_timestamps()[:readings].tolist()
+
+    lit = result.light_on[:readings].astype(np.int8)
+    edges = np.diff(np.r_[0, lit, 0])
+    epochs = times.astype('int64').astype(float)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    end_epochs = np.r_[epochs, epochs[-1] + 60][ends]
+    return {
+        "readings": list(zip(stamps, values.tolist())),
+        "timestamps": stamps,
+        "times": times,
+        "values": values,
+        "light_intervals": list(zip(epochs[starts].tolist(), end_epochs.tolist())),
+        "days": days,
+    }
+
+
+# --- Benchmarks ------------------------------------------------------------
+# Each takes the history and returns a zero-argument callable to time.
+
+def bench_analyze_trend(history):
+    from plant_monitor import MoistureTrendAnalyzer
+    analyzer = MoistureTrendAnalyzer()
+    return lambda: analyzer.analyze_trend(history["readings"])
+
+
+def bench_analyze_moisture(history):
+    from moisture_analysis import analyze_moisture_trend
+    return lambda: analyze_moisture_trend(history["readings"])
+
+
+def bench_text_chart(history):
+    import io
+    import contextlib
+    from visualize_moisture import text_chart
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            text_chart(history["readings"])
+    return run
+
+
+def bench_parse_timestamps(history):
+    from readings import parse_timestamps
+    return lambda: parse_timestamps(history["timestamps"])
+
+
+def bench_rollup_daily_state(history):
+    from daily_state import DailyStateStore
+
+    def run():
+        with DailyStateStore(":memory:") as store:
+            for timestamp, value in history["readings"]:
+                store.ingest_moisture(timestamp, value)
+            store.commit()
+    return run
+
+
+def bench_rollup_light(history):
+    from datetime import timedelta
+    from light_history import LightHistoryIndex
+
+    first = datetime.fromisoformat(history["timestamps"][0].replace('Z', '+00:00')).date()
+    last = first + timedelta(days=history["days"] - 1)
+
+    def run():
+        LightHistoryIndex(history["light_intervals"]).compliance(first, last)
+    return run
+
+
+def bench_plan_days(history):
+    from photoperiod_planner import plan_days
+    now = datetime.fromisoformat(history["timestamps"][0].replace('Z', '+00:00'))
+    return lambda: plan_days(840, now, days=history["days"])
+
+
+# name -> (setup, largest size run by default)
+BENCHMARKS: Dict[str, tuple] = {
+    "analyze_trend": (bench_analyze_trend, None),
+    "analyze_moisture": (bench_analyze_moisture, None),
+    "text_chart": (bench_text_chart, None),
+    "parse_timestamps": (bench_parse_timestamps, None),
+    "rollup_daily_state": (bench_rollup_daily_state, 100_000),  # ~10 us/reading: minutes at 10M
+    "rollup_light": (bench_rollup_light, None),
+    "plan_days": (bench_plan_days, None),
+}
+
+
+def time_case(fn: Callable[[], object]) -> Dict:
+    """
+    Best and median seconds per call of fn
+
+    Fast cases are looped (as timeit's autorange does) so each sample runs
+    for at least MIN_SAMPLE_SECONDS; samples are taken until MIN_SECONDS or
+    MAX_REPEATS.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            break
+        number *= 10
+    timings = [elapsed / number]
+    total = elapsed
+    while len(timings) < MAX_REPEATS and total < MIN_SECONDS:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed / number)
+        total += elapsed
+    return {"best_s": min(timings), "median_s": statistics.median(timings),
+            "repeats": len(timings), "loops": number}
+
+
+def run_suite(sizes=SIZES, only: Optional[List[str]] = None, full: bool = False,
+              report: Callable[[str], None] = print) -> Dict:
+    """
+    Time every benchmark at every size
+
+    Args:
+        sizes: History lengths in readings
+        only: Benchmark names to run (default: all)
+        full: Also run benchmarks above their default size limit
+        report: Called with one line per finished case
+
+    Returns:
+        Run record: metadata plus results[benchmark][size]
+    """
+    names = only or list(BENCHMARKS)
+    run = {
+        "timestamp": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "results": {name: {} for name in names},
+    }
+    for size in sizes:
+        started = time.perf_counter()
+        history = synthetic_history(size)
+        report(f"[{size:,} readings] history built in {time.perf_counter() - started:.1f} s")
+        for name in names:
+            setup, max_size = BENCHMARKS[name]
+            if max_size is not None and size > max_size and not full:
+                run["results"][name][str(size)] = {"skipped": f"over {max_size:,} readings (use --full)"}
+                continue
+            result = time_case(setup(history))
+            result["ns_per_reading"] = round(result["best_s"] * 1e9 / size, 1)
+            run["results"][name][str(size)] = result
+            report(f"  {name:<20} {result['best_s'] * 1000:10.2f} ms  "
+                   f"{result['ns_per_reading']:9.1f} ns/reading  (x{result['repeats']})")
+        del history
+    return run
+
+
+def compare(run: Dict, previous: Optional[Dict]) -> List[str]:
+    """Lines describing cases that got slower than REGRESSION_RATIO since `previous`"""
+    if not previous:
+        return []
+    lines = []
+    for name, by_size in run["results"].items():
+        for size, result in by_size.items():
+            before = previous["results"].get(name, {}).get(size, {})
+            if "best_s" in result and "best_s" in before and before["best_s"] > 0:
+                ratio = result["best_s"] / before["best_s"]
+                if ratio > REGRESSION_RATIO:
+                    lines.append(f"{name} @ {int(size):,}: {ratio:.2f}x slower than {previous['commit'] or 'previous run'}")
+    return lines
+
+
+def load_results(path: str = RESULTS_FILE) -> List[Dict]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_results(run: Dict, path: str = RESULTS_FILE):
+    runs = load_results(path)
+    runs.append(run)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(runs, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _git_commit() -> Optional[str]:
+    import subprocess
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    def option(name, default=None):
+        return args[args.index(name) + 1] if name in args else default
+
+    sizes = [int(s) for s in option("--sizes", ",".join(map(str, SIZES))).split(",")]
+    only = option("--only").split(",") if option("--only") else None
+    unknown = [name for name in only or [] if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}; available: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+    out = option("--out", RESULTS_FILE)
+
+    previous = (load_results(out) or [None])[-1]
+    run = run_suite(sizes, only, full="--full" in args)
+    save_results(run, out)
+    print(f"✓ Saved: {out}")
+    for line in compare(run, previous):
+        print(f"⚠️ {line}")
@@ -4,10 +4,11 @@ Cycle 3 Sustained Oscillation Analysis
 BREAKTHROUGH: Multiple bounces, not single dampened bounce!
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 
+from chart_pipeline import get_pyplot, save_figure
+
 # High-resolution C3 data (06:00 onwards)
 timestamps = [
     "2025-11-03T06:00:32Z",  # Peak #1
@@ -110,6 +111,7 @@ print()
 print("=" * 70)
 
 # Create visualization
+plt = get_pyplot()
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
 
 # Plot 1: Moisture over time
@@ -166,6 +168,6 @@ for rt, r in zip(rate_times, rates):
             ha='center', va='bottom' if r > 0 else 'top', fontsize=9, fontweight='bold')
 
 plt.tight_layout()
-plt.savefig('/home/gardener/workspace/c3_sustained_oscillation.png', dpi=150, bbox_inches='tight')
+save_figure(fig, '/home/gardener/workspace/c3_sustained_oscillation.png')
 print("\n📊 Visualization saved to: c3_sustained_oscillation.png")
 print()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Shared PNG chart pipeline for moisture trend charts.
+
+- matplotlib is imported lazily (get_pyplot) on the Agg backend, so scripts
+  that never draw don't pay for it
+- series are downsampled with Largest-Triangle-Three-Buckets to about the
+  pixel width of the plot before drawing
+- the trend figure (axes, threshold lines, formatters) is built once per
+  process and reused; each chart only swaps the line data
+- figures are saved with a fixed layout at screen dpi, no bbox_inches='tight'
+  (which costs an extra layout pass)
+- trend PNGs are written incrementally: a chart whose downsampled data and
+  options are unchanged since the last write is skipped
+
+Usage:
+    python chart_pipeline.py data.json out.png
+"""
+
+import os
+import sys
+import json
+import hashlib
+import numpy as np
+from typing import Dict, Optional
+
+from readings import to_arrays
+from profiling import profiled
+
+DEFAULT_DPI = 100
+SIGNATURE_FILE = ".chart_signatures.json"
+
+# Same boundaries used across the analysis charts
+DEFAULT_THRESHOLDS = [
+    (1900, 'green', 'Optimal/Monitor boundary'),
+    (2000, 'orange', 'Monitor/Water Soon boundary'),
+    (2100, 'red', 'Water Soon/Water Now boundary'),
+]
+
+_pyplot = None
+_templates: Dict = {}
+
+
+def get_pyplot():
+    """Import matplotlib.pyplot on first use, forcing the non-interactive Agg backend"""
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _pyplot = plt
+    return _pyplot
+
+
+def save_figure(fig, path: str, dpi: int = DEFAULT_DPI):
+    """Save with the figure's own layout (no bbox_inches='tight' re-layout)"""
+    fig.savefig(path, dpi=dpi)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of threshold-2 equal-count
+    buckets, the point forming the largest triangle with the previously kept
+    point and the average of the next bucket.
+
+    Args:
+        x: Sorted x values (numeric)
+        y: y values
+        threshold: Number of points to keep
+
+    Returns:
+        Indices of the kept points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+
+    # Next-bucket averages for every bucket at once (the last uses the final point)
+    sum_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sum_y = np.add.reduceat(y[:n - 1], edges[:-1])
+    counts = np.diff(edges)
+    avg_x = np.append((sum_x / counts)[1:], x[-1])
+    avg_y = np.append((sum_y / counts)[1:], y[-1])
+
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    kept[-1] = n - 1
+    return kept
+
+
+class TrendTemplate:
+    """Prebuilt moisture trend figure; each render only replaces the line data"""
+
+    def __init__(self, width_px: int = 1200, height_px: int = 500, dpi: int = DEFAULT_DPI,
+                 thresholds=None):
+        plt = get_pyplot()
+        import matplotlib.dates as mdates
+
+        self.width_px = width_px
+        self.dpi = dpi
+        self.fig, self.ax = plt.subplots(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+        self.line, = self.ax.plot([], [], 'b-', linewidth=1.2, label='Moisture sensor')
+        for value, color, label in (DEFAULT_THRESHOLDS if thresholds is None else thresholds):
+            self.ax.axhline(y=value, color=color, linestyle='--', alpha=0.5, label=label)
+
+        self._date2num = mdates.date2num
+        self.ax.xaxis_date()
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.ax.set_xlabel('Time (UTC)')
+        self.ax.set_ylabel('Moisture Sensor Reading')
+        self.ax.grid(True, alpha=0.3)
+        self.ax.legend(loc='upper left', fontsize=9)
+        self.fig.subplots_adjust(left=0.07, right=0.98, top=0.92, bottom=0.12)
+        self._spans = []
+
+    def render(self, times: np.ndarray, values: np.ndarray, title: str, path: str, light_spans=()):
+        """Draw already-downsampled datetime64 / value arrays and save"""
+        for span in self._spans:
+            span.remove()
+        self._spans = [self.ax.axvspan(start, end, alpha=0.15, color='yellow', linewidth=0)
+                       for start, end in light_spans]
+
+        self.line.set_data(self._date2num(times), values)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title(title, fontsize=13, fontweight='bold')
+        save_figure(self.fig, path, dpi=self.dpi)
+
+
+def plot_points(width_px: int) -> int:
+    """Target point count: roughly one per horizontal pixel of the axes"""
+    return max(int(width_px * 0.91), 3)
+
+
+def get_template(width_px: int = 1200, height_px: int = 500) -> TrendTemplate:
+    """Reuse one TrendTemplate per size within the process"""
+    key = (width_px, height_px)
+    if key not in _templates:
+        _templates[key] = TrendTemplate(width_px, height_px)
+    return _templates[key]
+
+
+@profiled("chart.write_trend_png")
+def write_trend_png(readings, path: str, title: Optional[str] = None,
+                    width_px: int = 1200, height_px: int = 500,
+                    light_spans=(), force: bool = False) -> bool:
+    """
+    Write a moisture trend PNG, skipping the render if nothing changed
+
+    Args:
+        readings: List of [timestamp, value] pairs
+        path: Output PNG path
+        title: Chart title (default: date range)
+        width_px, height_px: Output size in pixels
+        light_spans: (start, end) datetime pairs to shade as light sessions
+        force: Render even if the signature matches the last write
+
+    Returns:
+        True if the PNG was (re)written
+    """
+    times, values = to_arrays(readings)
+    if times.size == 0:
+        return False
+
+    keep = lttb(times.astype(np.int64), values, plot_points(width_px))
+    times, values = times[keep], values[keep]
+    if title is None:
+        title = f"Moisture Trend - {times[0].astype('datetime64[m]')} to {times[-1].astype('datetime64[m]')} UTC"
+
+    signature = _signature(times, values, title, width_px, height_px, light_spans)
+    if not force and os.path.exists(path) and _load_signatures(path).get(os.path.basename(path)) == signature:
+        return False
+
+    get_template(width_px, height_px).render(times, values, title, path, light_spans)
+    _store_signature(path, signature)
+    return True
+
+
+def _signature(times, values, *options) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(times.astype(np.int64)).tobytes())
+    digest.update(np.ascontiguousarray(values.astype(np.float64)).tobytes())
+    digest.update(repr(options).encode())
+    return digest.hexdigest()
+
+
+def _signature_path(path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(path)), SIGNATURE_FILE)
+
+
+def _load_signatures(path: str) -> Dict:
+    try:
+        with open(_signature_path(path), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_signature(path: str, signature: str):
+    signatures = _load_signatures(path)
+    signatures[os.path.basename(path)] = signature
+    with open(_signature_path(path), 'w') as f:
+        json.dump(signatures, f, indent=2)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: chart_pipeline.py <data.json> <out.png>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r') as f:
+        data = json.load(f)
+
+    if write_trend_png(data, sys.argv[2]):
+        print(f"✓ Saved: {os.path.basename(sys.argv[2])}")
+    else:
+        print(f"Unchanged: {os.path.basename(sys.argv[2])}")
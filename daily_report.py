@@ -3,23 +3,39 @@
 Generate daily plant health report.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 
-def generate_daily_report(moisture_current, water_24h, light_today_minutes, plant_status):
+def generate_daily_report(moisture_current, water_24h, light_today_minutes, plant_status,
+                          report_time=None, day_stats=None):
     """
     Generate a concise daily health report.
 
     Args:
         moisture_current: Current moisture reading
-        water_24h: Water dispensed in last 24 hours (ml)
+        water_24h: Water dispensed in last 24 hours (ml), or on the UTC day
+                   of `day_stats` when that is given
         light_today_minutes: Light delivered today (minutes)
         plant_status: String status (healthy, stressed, etc)
+        report_time: datetime the report is for (default: now)
+        day_stats: Optional materialized daily_state row adding min/max,
+                   dawn median and photo count lines
     """
-    now = datetime.now()
+    now = report_time or datetime.now()
     date_str = now.strftime("%Y-%m-%d")
     time_str = now.strftime("%H:%M UTC")
 
+    moisture_stats = ""
+    photo_stats = ""
+    water_period = "24h"
+    if day_stats:
+        water_period = f"{day_stats['day']} UTC"
+        dawn = day_stats.get("dawn_median")
+        moisture_stats = (f"\n  Range Today: {day_stats['moisture_min']} - {day_stats['moisture_max']}"
+                          f" ({day_stats['moisture_count']} readings)"
+                          f"\n  Dawn Median: {f'{dawn:.0f}' if dawn is not None else 'n/a'}")
+        photo_stats = f"\n  ✓ {day_stats['photo_count']} photo(s) captured today"
+
     report = f"""
 ╔════════════════════════════════════════════════════════════════╗
 ║          PLANT HEALTH REPORT - {date_str}                 ║
@@ -32,7 +48,7 @@ Overall Status: {plant_status.upper()}
 ─────────────────────────────────────────────────────────────────
 MOISTURE
 ─────────────────────────────────────────────────────────────────
-  Current Reading: {moisture_current}
+  Current Reading: {moisture_current}{moisture_stats}
   Status: {"✅ EXCELLENT" if moisture_current > 2000 else "✅ GOOD" if moisture_current > 1900 else "⚠️  LOW" if moisture_current > 1800 else "❌ CRITICAL"}
 
   Reservoir: {"Full capacity" if moisture_current > 2000 else "Good level" if moisture_current > 1900 else "Getting low" if moisture_current > 1800 else "Needs refill"}
@@ -40,7 +56,7 @@ MOISTURE
 ─────────────────────────────────────────────────────────────────
 WATERING
 ─────────────────────────────────────────────────────────────────
-  Water Dispensed (24h): {water_24h} ml
+  Water Dispensed ({water_period}): {water_24h} ml
   Action: {"None - self-watering system working" if water_24h == 0 else f"Refilled reservoir with {water_24h}ml"}
 
 ─────────────────────────────────────────────────────────────────
@@ -56,7 +72,7 @@ OBSERVATIONS
   ✓ Self-watering pot reservoir functioning normally
   ✓ Generous light schedule producing vibrant purple coloration
   ✓ All monitoring and control systems operational
-  ✓ No signs of stress, disease, or pest issues
+  ✓ No signs of stress, disease, or pest issues{photo_stats}
 
 ─────────────────────────────────────────────────────────────────
 NEXT ACTIONS
@@ -71,6 +87,24 @@ NEXT ACTIONS
     return report
 
 
+def report_from_state(row, plant_status="healthy"):
+    """
+    Render the report for one materialized daily_state row (see daily_state.py)
+
+    Water and light are that UTC day's totals; moisture is the day's last reading.
+    """
+    report_time = datetime.fromisoformat(row["moisture_last_at"].replace('Z', '+00:00')) \
+        if row.get("moisture_last_at") else datetime.fromisoformat(row["day"]).replace(tzinfo=timezone.utc)
+    return generate_daily_report(row["moisture_last"], row["water_ml"], round(row["light_minutes"]),
+                                 plant_status, report_time=report_time, day_stats=row)
+
+
+def render_history(store, days=90, plant_status="healthy"):
+    """Re-render reports for the last `days` days from precomputed rows"""
+    return [report_from_state(row, plant_status) for row in store.recent(days=days)
+            if row["moisture_last"] is not None]
+
+
 if __name__ == "__main__":
     # Example usage
     import sys
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Materialized daily plant state.
+
+One row per UTC day holding light minutes, water dispensed, moisture
+min/max/last, the dawn median and photo count. Each ingested event updates
+its day's row with a single SQLite upsert, so today's report (or the last 90
+days) is a read of precomputed rows instead of a pass over raw history.
+
+Dawn medians come from DawnMedianEngine; readings inside the open dawn window
+are also kept in a small side table so the running median survives a restart.
+The engine has to work in UTC so its dawn days are the same days as every
+other column of the row.
+"""
+
+import sys
+import json
+import sqlite3
+from datetime import datetime, date, timedelta, timezone
+from typing import List, Dict, Optional
+
+from dawn_median import DawnMedianEngine
+
+DEFAULT_DB = "plant_state.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_state (
+    day TEXT PRIMARY KEY,
+    light_minutes REAL NOT NULL DEFAULT 0,
+    water_ml REAL NOT NULL DEFAULT 0,
+    waterings INTEGER NOT NULL DEFAULT 0,
+    moisture_min INTEGER,
+    moisture_max INTEGER,
+    moisture_last INTEGER,
+    moisture_last_at TEXT,
+    moisture_count INTEGER NOT NULL DEFAULT 0,
+    dawn_median REAL,
+    photo_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS dawn_readings (
+    day TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    value REAL NOT NULL
+);
+"""
+
+def _parse(timestamp) -> datetime:
+    if isinstance(timestamp, datetime):
+        return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _iso(t: datetime) -> str:
+    return t.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class DailyStateStore:
+    """Per-day aggregates maintained incrementally as events are ingested"""
+
+    def __init__(self, path: str = DEFAULT_DB, dawn_engine: Optional[DawnMedianEngine] = None):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.dawn = dawn_engine or DawnMedianEngine()
+        if getattr(self.dawn.tz, "key", None) not in ("UTC", "Etc/UTC"):
+            raise ValueError(f"Dawn engine must use UTC days, not {self.dawn.tz}")
+
+        # Rebuild the running dawn medians of days whose window may still be open,
+        # then close what the newest stored reading closed, so a late reading
+        # can't reopen a finished day and overwrite its stored median
+        for row in self.conn.execute("SELECT timestamp, value FROM dawn_readings ORDER BY timestamp"):
+            self.dawn.add(row["timestamp"], row["value"])
+        latest = self.conn.execute("SELECT MAX(moisture_last_at) FROM daily_state").fetchone()[0]
+        if latest:
+            self.dawn.advance(latest)
+        if self.dawn.closed_through is not None:
+            self.conn.execute("DELETE FROM dawn_readings WHERE day <= ?", (self.dawn.closed_through.isoformat(),))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.commit()
+        self.close()
+
+    # --- Ingestion -----------------------------------------------------
+
+    def ingest_moisture(self, timestamp, value: int):
+        t = _parse(timestamp)
+        day = t.astimezone(timezone.utc).date().isoformat()
+        stamp = _iso(t)
+        self.conn.execute(
+            """INSERT INTO daily_state (day, moisture_min, moisture_max, moisture_last,
+                                        moisture_last_at, moisture_count)
+               VALUES (?, ?, ?, ?, ?, 1)
+               ON CONFLICT(day) DO UPDATE SET
+                   moisture_min = MIN(COALESCE(moisture_min, excluded.moisture_min), excluded.moisture_min),
+                   moisture_max = MAX(COALESCE(moisture_max, excluded.moisture_max), excluded.moisture_max),
+                   moisture_last = CASE WHEN moisture_last_at IS NULL OR excluded.moisture_last_at >= moisture_last_at
+                                        THEN excluded.moisture_last ELSE moisture_last END,
+                   moisture_last_at = MAX(COALESCE(moisture_last_at, ''), excluded.moisture_last_at),
+                   moisture_count = moisture_count + 1""",
+            (day, value, value, value, stamp))
+
+        open_before = set(self.dawn.open_days)
+        median = self.dawn.add(t, value)
+        if median is not None:
+            self.conn.execute("INSERT INTO dawn_readings (day, timestamp, value) VALUES (?, ?, ?)",
+                              (day, stamp, value))
+            self._upsert(day, "dawn_median = excluded.dawn_median", dawn_median=median)
+        closed = open_before - set(self.dawn.open_days)
+        if closed:
+            self.conn.execute("DELETE FROM dawn_readings WHERE day <= ?", (max(closed).isoformat(),))
+
+    def ingest_water(self, timestamp, amount_ml: float):
+        day = _parse(timestamp).astimezone(timezone.utc).date().isoformat()
+        self._upsert(day, "water_ml = water_ml + excluded.water_ml, waterings = waterings + 1",
+                     water_ml=amount_ml, waterings=1)
+
+    def ingest_light(self, start, end=None, minutes: Optional[float] = None):
+        """Record a light session; minutes are split across the UTC days it spans"""
+        if end is None and minutes is None:
+            raise ValueError("Light session needs an end or a duration in minutes")
+        start = _parse(start)
+        end = _parse(end) if end is not None else start + timedelta(minutes=minutes)
+        cursor = start
+        while cursor < end:
+            next_midnight = datetime.combine(cursor.astimezone(timezone.utc).date() + timedelta(days=1),
+                                             datetime.min.time(), tzinfo=timezone.utc)
+            chunk_end = min(end, next_midnight)
+            lit = (chunk_end - cursor).total_seconds() / 60
+            self._upsert(cursor.astimezone(timezone.utc).date().isoformat(),
+                         "light_minutes = light_minutes + excluded.light_minutes", light_minutes=lit)
+            cursor = chunk_end
+
+    def ingest_photo(self, timestamp):
+        day = _parse(timestamp).astimezone(timezone.utc).date().isoformat()
+        self._upsert(day, "photo_count = photo_count + 1", photo_count=1)
+
+    def ingest_events(self, events: List[Dict]):
+        """
+        Ingest a batch of events in one transaction
+
+        Args:
+            events: dicts with a "type" of moisture / water / light / photo and
+                    timestamp, value / amount_ml / start+end or minutes fields
+        """
+        with self.conn:
+            for event in events:
+                kind = event["type"]
+                if kind == "moisture":
+                    self.ingest_moisture(event["timestamp"], event["value"])
+                elif kind == "water":
+                    self.ingest_water(event["timestamp"], event["amount_ml"])
+                elif kind == "light":
+                    self.ingest_light(event.get("start", event.get("timestamp")),
+                                      event.get("end"), event.get("minutes"))
+                elif kind == "photo":
+                    self.ingest_photo(event["timestamp"])
+                else:
+                    raise ValueError(f"Unknown event type: {kind}")
+
+    def commit(self):
+        self.conn.commit()
+
+    def _upsert(self, day: str, update_sql: str, **values):
+        names = ", ".join(values)
+        marks = ", ".join("?" for _ in values)
+        self.conn.execute(
+            f"INSERT INTO daily_state (day, {names}) VALUES (?, {marks}) "
+            f"ON CONFLICT(day) DO UPDATE SET {update_sql}",
+            (day, *values.values()))
+
+    # --- Reads -----------------------------------------------------------
+
+    def day(self, day: Optional[date] = None) -> Optional[Dict]:
+        """Materialized row for a UTC day (default: today)"""
+        day = (day or datetime.now(timezone.utc).date()).isoformat()
+        row = self.conn.execute("SELECT * FROM daily_state WHERE day = ?", (day,)).fetchone()
+        return dict(row) if row else None
+
+    def recent(self, days: int = 90, until: Optional[date] = None) -> List[Dict]:
+        """Rows for the last `days` days up to `until` (default: today), oldest first"""
+        until = until or datetime.now(timezone.utc).date()
+        since = until - timedelta(days=days - 1)
+        rows = self.conn.execute("SELECT * FROM daily_state WHERE day BETWEEN ? AND ? ORDER BY day",
+                                 (since.isoformat(), until.isoformat()))
+        return [dict(row) for row in rows]
+
+
+if __name__ == "__main__":
+    # Usage: daily_state.py <db> [events.json]  - ingest events, then print recent rows
+    db = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB
+    with DailyStateStore(db) as store:
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], 'r') as f:
+                store.ingest_events(json.load(f))
+        for row in store.recent(days=7):
+            print(json.dumps(row))
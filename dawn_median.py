@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Dawn median engine for the daily watering decision.
+
+Working protocol: water 20ml when the dawn median is >= 2170.
+
+Readings that fall inside the local-time dawn window are pushed into a
+two-heap running median for that day as they arrive, so the day's dawn
+median is always current (O(log n) per reading, O(1) to read). Once a
+reading past the window end (or any reading from a later day) arrives the
+day is closed: its heaps are dropped and only the median is kept. Every
+day up to the newest closed one is final - readings for it that arrive out
+of order are counted as late and ignored. The morning decision and the
+dawn median history are then plain dictionary lookups.
+
+Usage:
+    python dawn_median.py data.json [timezone] [HH:MM-HH:MM]
+"""
+
+import sys
+import json
+import heapq
+from datetime import datetime, date, time, timedelta, timezone
+from typing import List, Tuple, Dict, Optional
+from zoneinfo import ZoneInfo
+
+DAWN_THRESHOLD = 2170
+DAWN_DOSE_ML = 20
+
+
+class StreamingMedian:
+    """Insert-only running median using a max-heap / min-heap pair"""
+
+    def __init__(self):
+        self._low = []   # max-heap (negated) of the lower half
+        self._high = []  # min-heap of the upper half
+
+    def __len__(self):
+        return len(self._low) + len(self._high)
+
+    def add(self, value: float):
+        if self._low and value > -self._low[0]:
+            heapq.heappush(self._high, value)
+        else:
+            heapq.heappush(self._low, -value)
+        # Rebalance so len(low) == len(high) or len(high) + 1
+        if len(self._low) > len(self._high) + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+        elif len(self._high) > len(self._low):
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+
+    def median(self) -> Optional[float]:
+        if not self._low:
+            return None
+        if len(self._low) > len(self._high):
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+
+class DawnMedianEngine:
+    """Maintain one dawn median per local day, updated as readings arrive"""
+
+    def __init__(self,
+                 tz: str = "UTC",
+                 window_start: str = "04:00",
+                 window_end: str = "06:00",
+                 threshold: float = DAWN_THRESHOLD,
+                 dose_ml: float = DAWN_DOSE_ML):
+        """
+        Args:
+            tz: IANA timezone the dawn window is expressed in
+            window_start: Local start of the dawn window (HH:MM, inclusive)
+            window_end: Local end of the dawn window (HH:MM, exclusive)
+            threshold: Water when the dawn median is >= this value
+            dose_ml: Amount to water when the threshold is reached
+        """
+        self.tz = ZoneInfo(tz)
+        self.window_start = time.fromisoformat(window_start)
+        self.window_end = time.fromisoformat(window_end)
+        if self.window_end <= self.window_start:
+            raise ValueError("Dawn window must start and end on the same local day")
+        self.threshold = threshold
+        self.dose_ml = dose_ml
+
+        self.medians: Dict[date, float] = {}
+        self.counts: Dict[date, int] = {}
+        self._open: Dict[date, StreamingMedian] = {}
+        self.closed_through: Optional[date] = None
+        self.late_readings = 0
+
+    def add(self, timestamp, value: float) -> Optional[float]:
+        """
+        Ingest one reading
+
+        Args:
+            timestamp: ISO timestamp string or aware datetime
+            value: Raw sensor reading
+
+        Returns:
+            The updated dawn median if the reading fell in a dawn window, else None
+        """
+        day, clock = self._local(timestamp)
+        if self.closed_through is not None and day <= self.closed_through:
+            # Window already closed for this day
+            if self.window_start <= clock < self.window_end:
+                self.late_readings += 1
+            return None
+
+        self._advance(day, clock)
+        if not self.window_start <= clock < self.window_end:
+            return None
+
+        if day not in self._open:
+            self._open[day] = StreamingMedian()
+        running = self._open[day]
+        running.add(value)
+        self.medians[day] = running.median()
+        self.counts[day] = len(running)
+        return self.medians[day]
+
+    def add_many(self, readings: List[Tuple[str, float]]):
+        for timestamp, value in readings:
+            self.add(timestamp, value)
+
+    def advance(self, timestamp):
+        """Close the windows a reading at `timestamp` would close, without adding a value"""
+        self._advance(*self._local(timestamp))
+
+    def _local(self, timestamp) -> Tuple[date, time]:
+        if not isinstance(timestamp, datetime):
+            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        local = timestamp.astimezone(self.tz)
+        return local.date(), local.time()
+
+    def _advance(self, day: date, clock: time):
+        # A reading from a later day means every earlier window is over,
+        # even if no reading arrived after it ended on its own day
+        self._close(day if clock >= self.window_end else day - timedelta(days=1))
+
+    @property
+    def open_days(self) -> List[date]:
+        """Days whose dawn window may still receive readings"""
+        return sorted(self._open)
+
+    def _close(self, day: date):
+        """Drop the heaps for every open day up to and including `day`"""
+        for open_day in [d for d in self._open if d <= day]:
+            del self._open[open_day]
+        if self.closed_through is None or day > self.closed_through:
+            self.closed_through = day
+
+    def dawn_median(self, day: Optional[date] = None) -> Optional[float]:
+        """Dawn median for a local day (default: latest day with dawn readings)"""
+        if day is None:
+            if not self.medians:
+                return None
+            day = max(self.medians)
+        return self.medians.get(day)
+
+    def decision(self, day: Optional[date] = None) -> Dict:
+        """Morning watering decision for a local day"""
+        if day is None:
+            day = max(self.medians) if self.medians else datetime.now(self.tz).date()
+        median = self.medians.get(day)
+        if median is None:
+            return {"date": day.isoformat(), "dawn_median": None, "action": "NO_DATA",
+                    "amount_ml": 0, "readings": 0, "final": False}
+        water = median >= self.threshold
+        return {
+            "date": day.isoformat(),
+            "dawn_median": median,
+            "action": "WATER" if water else "NO_WATER",
+            "amount_ml": self.dose_ml if water else 0,
+            "readings": self.counts[day],
+            "final": day not in self._open,
+        }
+
+    def history(self) -> List[Dict]:
+        """Dawn median and decision for every day seen, oldest first"""
+        return [self.decision(day) for day in sorted(self.medians)]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: dawn_median.py <data.json> [timezone] [HH:MM-HH:MM]")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r') as f:
+        data = json.load(f)
+    tz = sys.argv[2] if len(sys.argv) > 2 else "UTC"
+    start, end = (sys.argv[3] if len(sys.argv) > 3 else "04:00-06:00").split('-')
+
+    engine = DawnMedianEngine(tz=tz, window_start=start, window_end=end)
+    engine.add_many(data)
+
+    print(f"Dawn window {start}-{end} ({tz}), threshold {engine.threshold}")
+    for row in engine.history():
+        print(f"{row['date']}: median={row['dawn_median']:7.1f} "
+              f"({row['readings']} readings) -> {row['action']}"
+              f"{' ' + str(row['amount_ml']) + 'ml' if row['amount_ml'] else ''}")
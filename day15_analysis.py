@@ -5,8 +5,8 @@ Day 15 Analysis - Visualizing oscillation patterns and evening event
 
 import json
 from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+
+from chart_pipeline import get_pyplot, save_figure
 
 # Day 15 moisture data (from the 6-hour history, expanded with recent readings)
 data = [
@@ -39,6 +39,9 @@ moisture = [d[1] for d in data]
 labels = [d[2] for d in data]
 
 # Create figure
+plt = get_pyplot()
+import matplotlib.dates as mdates
+
 fig, ax = plt.subplots(figsize=(16, 8))
 
 # Plot moisture
@@ -85,7 +88,7 @@ ax.annotate('Evening\noscillation\n(5 phases)', xy=(datetime.fromisoformat("2025
             fontsize=10, ha='center', bbox=dict(boxstyle='round', facecolor='plum', alpha=0.5))
 
 plt.tight_layout()
-plt.savefig('/home/gardener/workspace/day15_evening_analysis.png', dpi=150, bbox_inches='tight')
+save_figure(fig, '/home/gardener/workspace/day15_evening_analysis.png')
 print("✓ Saved: day15_evening_analysis.png")
 
 # Print summary statistics
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Decoded-frame cache for repeated image analyses.
+
+Every analysis run used to decode the same JPEGs again. FrameCache keeps the
+decoded, downscaled RGB frame of each photo as a uint8 .npy file keyed by
+the photo's content hash and the decode width; later runs np.load() it with
+mmap_mode='r', so pixels come straight from the page cache with no JPEG
+decode at all.
+
+The cache is bounded by total size: entries are kept in least-recently-used
+order (file mtimes are bumped on every hit, so the order survives restarts)
+and the oldest are deleted once a write pushes the total over max_bytes.
+
+It is optional - growth_analysis and timelapse take a `cache` argument and
+decode directly when it is None.
+
+Usage:
+    python frame_cache.py [archive_dir] [--width N] [--max-mb N]   - warm the cache
+    python frame_cache.py --clear
+"""
+
+import os
+import sys
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from profiling import profiled
+
+DEFAULT_DIR = ".frame_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_WIDTH = 480
+
+
+@profiled("image.decode_frame")
+def decode_frame(source, width: int) -> np.ndarray:
+    """
+    Decode a photo to RGB near `width` pixels wide
+
+    JPEG draft mode picks the smallest DCT scale (1/2, 1/4, 1/8) that is still
+    at least `width` wide, so the result can be a little wider than asked.
+
+    Args:
+        source: File path or file object
+        width: Minimum decoded width
+
+    Returns:
+        uint8 array, H x W x 3
+    """
+    from PIL import Image
+
+    with Image.open(source) as img:
+        img.draft('RGB', (width, max(img.height * width // max(img.width, 1), 1)))
+        return np.asarray(img.convert('RGB'))
+
+
+class FrameCache:
+    """Size-bounded LRU cache of decoded frames stored as memory-mapped .npy files"""
+
+    def __init__(self, directory: str = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total size kept on disk before the oldest frames are evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # path -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        found = []
+        for sub in os.listdir(directory):
+            subdir = os.path.join(directory, sub)
+            if not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                if name.endswith('.npy'):
+                    st = os.stat(os.path.join(subdir, name))
+                    found.append((st.st_mtime, os.path.join(subdir, name), st.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+        self.total_bytes = sum(self._entries.values())
+        self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def path(self, sha: str, width: int) -> str:
+        return os.path.join(self.directory, sha[:2], f"{sha}_{width}.npy")
+
+    def get(self, sha: str, width: int) -> Optional[np.ndarray]:
+        """Read-only memmap of a cached frame, or None"""
+        path = self.path(sha, width)
+        try:
+            frame = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        if path in self._entries:
+            self._entries.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return frame
+
+    def put(self, sha: str, width: int, frame: np.ndarray) -> np.ndarray:
+        """Store a frame and return it as a read-only memmap"""
+        path = self.path(sha, width)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(frame, dtype=np.uint8))
+        os.replace(tmp, path)
+
+        size = os.path.getsize(path)
+        self.total_bytes += size - self._entries.pop(path, 0)
+        self._entries[path] = size
+        self._evict(keep=path)
+        return np.load(path, mmap_mode='r')
+
+    def frame(self, source, width: int = DEFAULT_WIDTH, sha: Optional[str] = None) -> np.ndarray:
+        """
+        Decoded frame of a photo, from the cache when possible
+
+        Args:
+            source: Photo path
+            width: Decode width (part of the cache key)
+            sha: Content hash of the original photo; hashed from `source` when
+                 omitted (pass it when known - archive rows carry it)
+        """
+        if sha is None:
+            with open(source, 'rb') as f:
+                sha = hashlib.file_digest(f, 'sha256').hexdigest()
+        cached = self.get(sha, width)
+        if cached is not None:
+            return cached
+        return self.put(sha, width, decode_frame(source, width))
+
+    def clear(self):
+        for path in list(self._entries):
+            self._remove(path)
+
+    def _evict(self, keep: Optional[str] = None):
+        while self.total_bytes > self.max_bytes and self._entries:
+            path = next(iter(self._entries))
+            if path == keep:
+                if len(self._entries) == 1:
+                    break
+                self._entries.move_to_end(path)
+                continue
+            self._remove(path)
+
+    def _remove(self, path: str):
+        self.total_bytes -= self._entries.pop(path, 0)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--width": DEFAULT_WIDTH, "--max-mb": DEFAULT_MAX_BYTES // (1024 * 1024)}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = int(args[i + 1])
+            del args[i:i + 2]
+
+    cache = FrameCache(max_bytes=options["--max-mb"] * 1024 * 1024)
+    if "--clear" in args:
+        cache.clear()
+        print(f"✓ Cleared: {cache.directory}")
+        sys.exit(0)
+
+    from photo_archive import PhotoArchive, DEFAULT_ROOT
+    width = options["--width"]
+    with PhotoArchive(args[0] if args else DEFAULT_ROOT) as archive:
+        for photo in archive.all():
+            if photo.get("width"):
+                cache.frame(archive.level(photo, width), width, photo["sha256"])
+    print(f"✓ Cached: {len(cache)} frames, {cache.total_bytes / 1e6:.1f} MB "
+          f"({cache.hits} already cached, {cache.misses} decoded)")
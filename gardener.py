@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+gardener - one entry point for the plant care tools.
+
+Each subcommand imports what it needs inside its own function, so a quick
+`gardener status` never pays for requests, numpy, matplotlib or PIL; only
+the commands that chart, decode photos or simulate load them. `startup`
+measures this with `python -X importtime` and fails when a command's
+startup goes over its budget (100 ms by default).
+
+`--profile PATH` (before the command) turns on the profiling hooks for the
+run; see profiling.py for the trace formats.
+
+Usage:
+    python gardener.py [--profile trace.jsonl|out.folded] <command> ...
+    python gardener.py status [plan.json]                     - today's state + pending jobs (offline)
+    python gardener.py analyze [readings.json]                - moisture trend + watering advice
+    python gardener.py chart [readings.json] [--png out.png]  - terminal chart (or PNG)
+    python gardener.py plan <remaining-minutes> [deadline-iso] - light sessions that fit (dry run)
+    python gardener.py detect-light <photo_url_or_path> | --batch <dir|glob> ...
+    python gardener.py report [days]                          - daily reports from plant_state.db
+    python gardener.py backtest [days] [seed]                 - replay the trend predictor on a simulation
+    python gardener.py startup [command] [--budget MS] [--runs N]
+"""
+
+import os
+import sys
+import json
+
+STARTUP_BUDGET_MS = 100
+STARTUP_RUNS = 5
+
+
+def _read_json(args):
+    """JSON from the first non-option argument, or stdin"""
+    paths = [a for a in args if not a.startswith('--')]
+    if paths:
+        with open(paths[0], 'r') as f:
+            return json.load(f)
+    return json.load(sys.stdin)
+
+
+def _option(args, name, default=None):
+    if name in args:
+        return args[args.index(name) + 1]
+    return default
+
+
+def cmd_status(args):
+    """Today's materialized state and the scheduler's pending jobs - sqlite and JSON only"""
+    from daily_state import DailyStateStore, DEFAULT_DB
+
+    plan_path = args[0] if args else "scheduler_plan.json"
+    if os.path.exists(DEFAULT_DB):
+        with DailyStateStore(DEFAULT_DB) as store:
+            today = store.day()
+        if today:
+            print(f"Today ({today['day']}): moisture {today['moisture_last']} "
+                  f"(range {today['moisture_min']}-{today['moisture_max']}), "
+                  f"light {today['light_minutes']:.0f} min, water {today['water_ml']:.0f} ml, "
+                  f"{today['photo_count']} photo(s)")
+        else:
+            print("No readings recorded today")
+    else:
+        print(f"No state database ({DEFAULT_DB})")
+
+    try:
+        with open(plan_path, 'r') as f:
+            plan = json.load(f)
+    except FileNotFoundError:
+        print(f"No scheduler plan ({plan_path})")
+        return 0
+    jobs = sorted(plan.get("jobs", []), key=lambda job: job["at"])
+    print(f"{len(jobs)} pending job(s), plan saved {plan.get('saved_at', '?')}")
+    for job in jobs[:5]:
+        print(f"  {job['at']}  {job['kind']:<8} {json.dumps(job['params'])}")
+    sessions = plan.get("sessions", [])
+    if sessions:
+        last = sessions[-1]
+        print(f"Last session: {json.dumps(last)}")
+    return 0
+
+
+def cmd_analyze(args):
+    from plant_monitor import MoistureTrendAnalyzer
+
+    readings = _read_json(args)
+    analyzer = MoistureTrendAnalyzer()
+    trend = analyzer.analyze_trend(readings)
+    result = {"trend": trend}
+    if trend.get("status") == "analyzed":
+        result["recommendation"] = analyzer.watering_recommendation(trend["last_value"], trend["rate_per_hour"])
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def cmd_chart(args):
+    readings = _read_json([a for a in args if a != _option(args, "--png")])
+    png = _option(args, "--png")
+    if png:
+        from chart_pipeline import write_trend_png
+        write_trend_png(readings, png)
+        print(f"✓ Saved: {png}")
+    else:
+        from visualize_moisture import text_chart
+        text_chart(readings)
+    return 0
+
+
+def cmd_plan(args):
+    if not args:
+        print("Usage: gardener.py plan <remaining-minutes> [deadline-iso]")
+        return 1
+    from datetime import datetime, timezone
+    from photoperiod_planner import plan_sessions
+
+    deadline = None
+    if len(args) > 1:
+        deadline = datetime.fromisoformat(args[1].replace('Z', '+00:00'))
+    plan = plan_sessions(int(args[0]), datetime.now(timezone.utc), deadline=deadline)
+    for at, minutes in plan["sessions"]:
+        print(f"{at.strftime('%Y-%m-%dT%H:%M:%SZ')}  {minutes} min")
+    if plan["sessions"]:
+        print(f"Finishes {plan['finish'].strftime('%Y-%m-%dT%H:%M:%SZ')}")
+    if plan["shortfall_minutes"]:
+        print(f"⚠️ {plan['shortfall_minutes']} min won't fit before the deadline")
+    return 0
+
+
+def cmd_detect_light(args):
+    import light_detector
+
+    sys.argv = ["light_detector.py"] + args
+    light_detector.main()
+    return 0
+
+
+def cmd_report(args):
+    from daily_state import DailyStateStore, DEFAULT_DB
+    from daily_report import render_history
+
+    days = int(args[0]) if args else 1
+    with DailyStateStore(DEFAULT_DB) as store:
+        reports = render_history(store, days=days)
+    if not reports:
+        print("No days with readings")
+    for report in reports:
+        print(report)
+    return 0
+
+
+def cmd_backtest(args):
+    """
+    Replay MoistureTrendAnalyzer on a simulated history
+
+    Every 6 hours the last 24 hours of readings are analysed; each watering
+    prediction is checked against when the simulated sensor actually reached
+    the threshold (the simulator's dawn watering threshold).
+    """
+    import numpy as np
+    from moisture_simulator import MoistureSimulator
+    from plant_monitor import MoistureTrendAnalyzer
+
+    days = int(args[0]) if args else 30
+    seed = int(args[1]) if len(args) > 1 else 0
+    step_minutes, window_hours, every_hours = 15, 24, 6
+
+    simulator = MoistureSimulator()
+    result = simulator.simulate(days=days, step_minutes=step_minutes, seed=seed)
+    readings = result.to_readings()
+    values = result.values[0]
+    analyzer = MoistureTrendAnalyzer()
+    analyzer.watering_threshold = simulator.dawn_threshold
+
+    per_hour = 60 // step_minutes
+    window, every = window_hours * per_hour, every_hours * per_hour
+    above = np.flatnonzero(values >= analyzer.watering_threshold)
+    made = hit = 0
+    errors = []
+    for end in range(window, len(readings), every):
+        trend = analyzer.analyze_trend(readings[end - window:end])
+        prediction = trend.get("prediction")
+        if not prediction:
+            continue
+        made += 1
+        later = above[np.searchsorted(above, end):]
+        if later.size:
+            hit += 1
+            actual_hours = (later[0] - (end - 1)) / per_hour
+            errors.append(prediction["hours_until_watering"] - actual_hours)
+
+    print(f"Backtest: {days} simulated days, {len(readings)} readings, "
+          f"threshold {analyzer.watering_threshold}")
+    print(f"  Predictions: {made} ({hit} followed by a threshold crossing)")
+    if errors:
+        errors = np.asarray(errors)
+        print(f"  Error (predicted - actual): mean {errors.mean():+.1f} h, "
+              f"MAE {np.abs(errors).mean():.1f} h, max {np.abs(errors).max():.1f} h")
+    return 0
+
+
+def _import_times(stderr: str):
+    """(cumulative_us, module) for each top-level import in `-X importtime` output"""
+    found = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            found.append((int(cumulative), name.strip()))
+    return found
+
+
+def startup_benchmark(command: str = "status", runs: int = STARTUP_RUNS, command_args=()):
+    """
+    Time `gardener.py <command>` in fresh interpreters
+
+    Args:
+        command: Subcommand to start
+        runs: Fresh processes to time (best wall time is reported)
+        command_args: Extra arguments for the subcommand
+
+    Returns:
+        dict with wall_ms (best of runs), import_ms (top-level cumulative
+        imports from -X importtime) and the slowest imports
+    """
+    import subprocess
+    import time
+
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), command, *command_args]
+    walls = []
+    stderr = ""
+    for _ in range(runs):
+        started = time.perf_counter()
+        done = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        walls.append((time.perf_counter() - started) * 1000)
+        stderr = done.stderr
+    imports = sorted(_import_times(stderr), reverse=True)
+    return {
+        "command": command,
+        "wall_ms": round(min(walls), 1),
+        "import_ms": round(sum(us for us, _ in imports) / 1000, 1),
+        "slowest": [(name, round(us / 1000, 1)) for us, name in imports[:8]],
+    }
+
+
+def cmd_startup(args):
+    budget = float(_option(args, "--budget", STARTUP_BUDGET_MS))
+    runs = int(_option(args, "--runs", STARTUP_RUNS))
+    positional = [a for a in args if not a.startswith('--') and a not in (_option(args, "--budget"),
+                                                                           _option(args, "--runs"))]
+    command = positional[0] if positional else "status"
+    result = startup_benchmark(command, runs, positional[1:])
+
+    print(f"gardener {command}: {result['wall_ms']} ms wall (best of {runs}), "
+          f"{result['import_ms']} ms in imports")
+    for name, ms in result["slowest"]:
+        print(f"  {ms:7.1f} ms  {name}")
+    if result["wall_ms"] > budget:
+        print(f"⚠️ Over the {budget:.0f} ms startup budget")
+        return 1
+    print(f"✓ Within the {budget:.0f} ms startup budget")
+    return 0
+
+
+COMMANDS = {
+    "status": cmd_status,
+    "analyze": cmd_analyze,
+    "chart": cmd_chart,
+    "plan": cmd_plan,
+    "detect-light": cmd_detect_light,
+    "report": cmd_report,
+    "backtest": cmd_backtest,
+    "startup": cmd_startup,
+}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--profile"] and len(argv) > 1:
+        # Before any instrumented module is imported
+        import profiling
+        profiling.enable(argv[1])
+        argv = argv[2:]
+    if not argv or argv[0] not in COMMANDS:
+        print(__doc__.split("Usage:")[1].rstrip())
+        return 1
+    return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
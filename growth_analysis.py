@@ -2,11 +2,148 @@
 """
 Plant Growth Analysis - Comparing Oct 22, 2025 (Day 1) vs Mar 26, 2026 (Day 156)
 Quantifying plant thriving over 156 days of autonomous care
+
+growth_metrics() turns every lit photo in the archive into one row of plant
+metrics (plant area, greenness, pink and pale leaf pixels). Photos are read at
+the smallest pyramid level that's wide enough, converted to HSV by PIL and
+segmented with uint8 thresholds, a chunk of photos at a time, so memory stays
+bounded however long the history is. With a FrameCache (--cache) decoded
+frames are reused across runs instead of decoding the JPEGs again.
+
+Usage:
+    python growth_analysis.py [archive_dir] [out.csv] [--cache]   - per-photo metrics table
+    python growth_analysis.py <old.jpg> <new.jpg>       - two-photo report
 """
 
+import sys
+import csv
 from PIL import Image
 import numpy as np
 from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from perceptual_hash import skip_similar, SIMILAR_BITS
+from frame_cache import decode_frame
+
+# HSV thresholds on PIL's 0-255 scale (hue 0-255 = 0-360 degrees), calibrated
+# on the committed lit photos: under the grow light the zebrina's leaves show
+# as white with pink edges and purple undersides, hardly any green, against
+# the black tray
+GREEN_HUE = (40, 120)    # ~55-170 deg: leaves in daylight
+MIN_SATURATION = 50
+MIN_VALUE = 40
+BLOOM_HUE = (200, 255)   # ~280-360 deg: pink leaf edges, purple undersides, blooms
+BLOOM_MIN_SATURATION = 25
+BLOOM_MIN_VALUE = 100    # the dark tray picks up a faint magenta cast
+PALE_MAX_SATURATION = 40
+PALE_MIN_VALUE = 235     # white leaf stripes; only glare on the tray gets this bright
+ANALYSIS_WIDTH = 480     # smallest pyramid level >= this is used
+CHUNK_PHOTOS = 16
+# Plant region: the tray around the pot, clear of the reservoir (left) and
+# the bags and floor behind the tray (top)
+ROI = (0.35, 0.90, 0.40, 0.72)
+
+
+def segment_plant(rgb: np.ndarray) -> Dict[str, float]:
+    """
+    Segment plant pixels in one RGB image (uint8, H x W x 3)
+
+    Returns:
+        dict with pixels, plant_pixels, green_pixels, bloom_pixels,
+        pale_pixels, plant_fraction and greenness (mean 2G-R-B over green
+        pixels)
+    """
+    hsv = np.asarray(Image.fromarray(rgb).convert('HSV'))
+    hue, sat, val = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+
+    green = (sat >= MIN_SATURATION) & (val >= MIN_VALUE) & (hue >= GREEN_HUE[0]) & (hue <= GREEN_HUE[1])
+    bloom = (sat >= BLOOM_MIN_SATURATION) & (val >= BLOOM_MIN_VALUE) \
+        & (hue >= BLOOM_HUE[0]) & (hue <= BLOOM_HUE[1])
+    pale = (sat <= PALE_MAX_SATURATION) & (val >= PALE_MIN_VALUE) & ~bloom
+
+    green_count = int(np.count_nonzero(green))
+    bloom_count = int(np.count_nonzero(bloom))
+    pale_count = int(np.count_nonzero(pale))
+    plant_count = green_count + bloom_count + pale_count
+    pixels = hue.size
+    if green_count:
+        g = rgb[green]  # only the masked pixels are widened
+        excess = 2 * g[:, 1].astype(np.int32) - g[:, 0] - g[:, 2]
+        greenness = float(excess.sum()) / green_count
+    else:
+        greenness = 0.0
+    return {
+        "pixels": pixels,
+        "plant_pixels": plant_count,
+        "green_pixels": green_count,
+        "bloom_pixels": bloom_count,
+        "pale_pixels": pale_count,
+        "plant_fraction": plant_count / pixels,
+        "greenness": greenness,
+    }
+
+
+def load_region(path: str, min_width: int = ANALYSIS_WIDTH, roi=ROI,
+                cache=None, sha: Optional[str] = None) -> np.ndarray:
+    """
+    Decode a photo near `min_width` (JPEG draft scaling) and crop the plant region
+
+    Args:
+        path: Photo path
+        min_width: Decode width
+        roi: (top, bottom, left, right) fractions of the frame
+        cache: Optional FrameCache; the decoded frame is read from / stored in it
+        sha: Content hash of the photo (cache key)
+    """
+    rgb = decode_frame(path, min_width) if cache is None else cache.frame(path, min_width, sha)
+    h, w = rgb.shape[:2]
+    top, bottom, left, right = roi
+    return rgb[int(h * top):int(h * bottom), int(w * left):int(w * right)]
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def growth_metrics(archive, min_width: int = ANALYSIS_WIDTH, chunk: int = CHUNK_PHOTOS,
+                   skip_similar_bits: Optional[int] = SIMILAR_BITS, cache=None) -> List[Dict]:
+    """
+    Plant metrics for every lit photo in a PhotoArchive, oldest first
+
+    Args:
+        archive: PhotoArchive
+        min_width: Analysis width; the smallest pyramid level >= this is read
+        chunk: Photos decoded per chunk (bounds peak memory)
+        skip_similar_bits: Skip photos whose perceptual hash is within this
+                           many bits of the previous analysed one (None: keep all)
+        cache: Optional FrameCache for the decoded frames
+
+    Returns:
+        One dict per photo: captured_at, sha256, session, cycle and the
+        segment_plant() metrics
+    """
+    photos = archive.all(light_state="ON")
+    if skip_similar_bits is not None:
+        photos = list(skip_similar(photos, max_bits=skip_similar_bits))
+    rows = []
+    for batch in _chunks(photos, chunk):
+        regions = [(photo, load_region(archive.level(photo, min_width), min_width,
+                                       cache=cache, sha=photo["sha256"]))
+                   for photo in batch]
+        for photo, region in regions:
+            metrics = segment_plant(region)
+            rows.append({"captured_at": photo["captured_at"], "sha256": photo["sha256"],
+                         "session": photo["session"], "cycle": photo["cycle"], **metrics})
+        del regions
+    return rows
+
+
+def write_metrics_csv(rows: List[Dict], path: str):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
 
 def analyze_images(old_path, new_path):
     """Compare two plant images to assess growth and changes"""
@@ -142,5 +279,27 @@ def analyze_images(old_path, new_path):
     print("=" * 80)
 
 if __name__ == "__main__":
-    analyze_images("/home/gardener/workspace/plant_oldest.jpg",
-                   "/home/gardener/workspace/plant_current.jpg")
+    if len(sys.argv) == 3 and sys.argv[1].lower().endswith('.jpg'):
+        analyze_images(sys.argv[1], sys.argv[2])
+        sys.exit(0)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    cache = None
+    if "--cache" in sys.argv:
+        from frame_cache import FrameCache
+        cache = FrameCache()
+
+    from photo_archive import PhotoArchive, DEFAULT_ROOT
+    with PhotoArchive(args[0] if args else DEFAULT_ROOT) as archive:
+        rows = growth_metrics(archive, cache=cache)
+    if not rows:
+        print("No lit photos in the archive")
+        sys.exit(0)
+
+    print(f"{'Captured':<21} {'Plant %':>8} {'Green px':>9} {'Bloom px':>9} {'Greenness':>10}")
+    for row in rows:
+        print(f"{row['captured_at']:<21} {100 * row['plant_fraction']:8.2f} {row['green_pixels']:9d} "
+              f"{row['bloom_pixels']:9d} {row['greenness']:10.1f}")
+    if len(args) > 1:
+        write_metrics_csv(rows, args[1])
+        print(f"✓ Saved: {args[1]}")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Plant health scores derived from stored time series.
+
+PlantHealthScorer.calculate_health_score takes four hand-filled booleans.
+This module derives the same four inputs from data and scores them with the
+same 25-point weights and status bands:
+
+- moisture stability: trailing std-dev (full credit <= 10, none >= 30,
+  the analyzer's "high"/"low" stability cut-offs)
+- moisture in range: fraction of trailing readings in 1500-2200
+- light adequacy: minutes lit in the trailing 24h vs the daily target
+  (from a LightHistoryIndex)
+- visual health: latest photo metric (0-1) at or before each hour;
+  full credit when there are no photos, like the visual_healthy default
+
+score_history() scores every hour of history in one vectorized pass using
+prefix sums; HealthTracker keeps the current score up to date incrementally.
+"""
+
+import sys
+import json
+import numpy as np
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Tuple, Dict
+
+from plant_monitor import PlantHealthScorer
+from readings import to_arrays, to_epoch_seconds
+from light_history import LightHistoryIndex
+
+OPTIMAL_RANGE = (1500, 2200)
+STABLE_STD = 10
+UNSTABLE_STD = 30
+DAILY_LIGHT_TARGET_MINUTES = 840
+FACTOR_POINTS = 25
+
+
+def stability_factor(std):
+    """1.0 at or below STABLE_STD, falling linearly to 0.0 at UNSTABLE_STD"""
+    return np.clip((UNSTABLE_STD - np.asarray(std, dtype=float)) / (UNSTABLE_STD - STABLE_STD), 0.0, 1.0)
+
+
+def score_history(readings: List[Tuple[str, int]],
+                  light_intervals=(),
+                  photo_metrics=(),
+                  window_hours: float = 6,
+                  step_hours: float = 1,
+                  light_target_minutes: float = DAILY_LIGHT_TARGET_MINUTES) -> Dict[str, np.ndarray]:
+    """
+    Score every `step_hours` of history in one pass
+
+    Args:
+        readings: Moisture readings as [timestamp, value] pairs
+        light_intervals: (start, end) timestamps of light sessions, or a LightHistoryIndex
+        photo_metrics: (timestamp, visual_score 0-1) per analysed photo
+        window_hours: Trailing window for moisture stability / range
+        step_hours: Scoring resolution
+
+    Returns:
+        dict of aligned arrays: times (datetime64[s]), score, status and the
+        four factor values (0-1)
+    """
+    times, values = to_arrays(readings)
+    if times.size == 0:
+        return {"times": times, "score": np.empty(0)}
+    t = to_epoch_seconds(times)
+    values = values.astype(np.float64)
+
+    step = step_hours * 3600
+    grid = np.arange(np.ceil(t[0] / step) * step, t[-1] + 1, step)
+
+    # Trailing-window moments from prefix sums
+    hi = np.searchsorted(t, grid, side='right')
+    lo = np.searchsorted(t, grid - window_hours * 3600, side='right')
+    count = hi - lo
+    csum = np.concatenate([[0.0], np.cumsum(values)])
+    csq = np.concatenate([[0.0], np.cumsum(values * values)])
+    in_range = ((values >= OPTIMAL_RANGE[0]) & (values <= OPTIMAL_RANGE[1])).astype(np.float64)
+    crange = np.concatenate([[0.0], np.cumsum(in_range)])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (csum[hi] - csum[lo]) / count
+        var = np.maximum((csq[hi] - csq[lo]) / count - mean * mean, 0.0)
+        stability = np.where(count >= 2, stability_factor(np.sqrt(var)), 0.0)
+        range_fraction = np.where(count > 0, (crange[hi] - crange[lo]) / count, 0.0)
+
+    index = light_intervals if isinstance(light_intervals, LightHistoryIndex) else LightHistoryIndex(light_intervals)
+    lit = index.lit_seconds_before_many(grid) - index.lit_seconds_before_many(grid - 86400)
+    light = np.minimum(lit / 60 / light_target_minutes, 1.0)
+
+    if len(photo_metrics):
+        photo_t, photo_v = to_arrays(photo_metrics)
+        idx = np.searchsorted(to_epoch_seconds(photo_t), grid, side='right') - 1
+        visual = np.where(idx >= 0, np.clip(photo_v.astype(np.float64)[np.maximum(idx, 0)], 0, 1), 1.0)
+    else:
+        visual = np.ones_like(grid)
+
+    score = FACTOR_POINTS * (stability + range_fraction + light + visual)
+    score = np.round(score, 1)
+    status = np.array([PlantHealthScorer.status_for(s) for s in score.tolist()])
+    return {
+        "times": grid.astype('datetime64[s]'),
+        "score": score,
+        "status": status,
+        "moisture_stability": stability,
+        "moisture_in_range": range_fraction,
+        "light_adequacy": light,
+        "visual_health": visual,
+    }
+
+
+class HealthTracker:
+    """Current health score, updated incrementally as data arrives"""
+
+    def __init__(self, window_hours: float = 6, light_target_minutes: float = DAILY_LIGHT_TARGET_MINUTES):
+        self.window_seconds = window_hours * 3600
+        self.light_target_minutes = light_target_minutes
+        self._readings = deque()
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._in_range = 0
+        self._light = deque()
+        self._now = None
+        self.visual = 1.0
+
+    def _epoch(self, timestamp) -> float:
+        if isinstance(timestamp, datetime):
+            return timestamp.replace(tzinfo=timestamp.tzinfo or timezone.utc).timestamp()
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+
+    def _advance(self, now: float):
+        self._now = now if self._now is None else max(self._now, now)
+        cutoff = self._now - self.window_seconds
+        while self._readings and self._readings[0][0] <= cutoff:
+            _, v = self._readings.popleft()
+            self._sum -= v
+            self._sumsq -= v * v
+            self._in_range -= OPTIMAL_RANGE[0] <= v <= OPTIMAL_RANGE[1]
+        while self._light and self._light[0][1] <= self._now - 86400:
+            self._light.popleft()
+
+    def update_moisture(self, timestamp, value: float):
+        t = self._epoch(timestamp)
+        self._readings.append((t, value))
+        self._sum += value
+        self._sumsq += value * value
+        self._in_range += OPTIMAL_RANGE[0] <= value <= OPTIMAL_RANGE[1]
+        self._advance(t)
+
+    def update_light(self, start, end):
+        self._light.append((self._epoch(start), self._epoch(end)))
+        self._advance(self._epoch(start))
+
+    def update_photo(self, timestamp, visual_score: float):
+        self.visual = min(max(visual_score, 0.0), 1.0)
+        self._advance(self._epoch(timestamp))
+
+    def current(self) -> Dict:
+        """Score in the same shape as PlantHealthScorer.calculate_health_score"""
+        n = len(self._readings)
+        if n >= 2:
+            mean = self._sum / n
+            std = max(self._sumsq / n - mean * mean, 0.0) ** 0.5
+            stability = float(stability_factor(std))
+        else:
+            stability = 0.0
+        in_range = self._in_range / n if n else 0.0
+
+        window_start = (self._now or 0) - 86400
+        lit = sum(max(0.0, min(e, self._now) - max(s, window_start)) for s, e in self._light)
+        light = min(lit / 60 / self.light_target_minutes, 1.0)
+
+        parts = {
+            "moisture_stability": stability,
+            "moisture_in_range": in_range,
+            "light_adequacy": light,
+            "visual_health": self.visual,
+        }
+        labels = {
+            "moisture_stability": ("Stable moisture", "⚠️ Unstable moisture"),
+            "moisture_in_range": ("Optimal moisture level", "⚠️ Moisture out of range"),
+            "light_adequacy": ("Adequate light", "⚠️ Insufficient light"),
+            "visual_health": ("Healthy appearance", "⚠️ Visual concerns"),
+        }
+        score = round(FACTOR_POINTS * sum(parts.values()), 1)
+        return {
+            "score": score,
+            "status": PlantHealthScorer.status_for(score),
+            "factors": [labels[k][0] if v >= 0.8 else labels[k][1] for k, v in parts.items()],
+            **{k: round(v, 3) for k, v in parts.items()},
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r') as f:
+            data = json.load(f)
+    else:
+        data = json.load(sys.stdin)
+
+    history = score_history(data)
+    for t, score, status in zip(history["times"], history["score"], history["status"]):
+        print(f"{t}: {score:5.1f} ({status})")
@@ -5,6 +5,8 @@ Light detection script - determines if grow light is ON or OFF from photo.
 Key insight from human feedback:
 - Light ON: Plant is visible, bright, clear image, larger file size (150-230KB)
 - Light OFF: Pitch black, cannot see plant, small file size (<50KB)
+- In between (50-100KB): decode at 1/8 scale and check mean brightness
+  (OFF captures are ~0/255, lit ones ~100/255)
 
 This addresses the recurring issue where the agent forgets how to distinguish
 light states every 5-10 days.
@@ -12,15 +14,166 @@ light states every 5-10 days.
 
 import sys
 import os
-import requests
+import glob
+import json
+import hashlib
+import tempfile
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-def detect_light_state(photo_url_or_path):
+from profiling import profiled
+
+# Size thresholds (bytes)
+OFF_MAX_BYTES = 50000
+ON_MIN_BYTES = 100000
+
+# Mean luminance (0-255) thresholds at 1/8 scale. Lights-off captures sit
+# below 1, lit ones around 100-110.
+OFF_MAX_MEAN = 20
+ON_MIN_MEAN = 50
+DARK_LEVEL = 32
+
+CACHE_FILE = ".light_state_cache.json"
+CACHE_VERSION = 1
+PHOTO_SUFFIXES = ('.jpg', '.jpeg')
+INLINE_BATCH = 64  # below this, starting a process pool costs more than it saves
+
+_session = None
+
+
+def get_session():
+    """Shared requests.Session so repeated checks reuse one pooled connection"""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+    return _session
+
+
+def remote_size(url: str, timeout: float = 10) -> int:
+    """
+    Size of a remote photo without downloading it
+
+    Tries HEAD / Content-Length first, then a one-byte ranged GET
+    (Content-Range: bytes 0-0/<total>), and only as a last resort streams the
+    body to count it (nothing is kept).
+    """
+    session = get_session()
+    response = session.head(url, allow_redirects=True, timeout=timeout)
+    if response.ok and response.headers.get('Content-Length') and \
+            'gzip' not in response.headers.get('Content-Encoding', ''):
+        return int(response.headers['Content-Length'])
+
+    with session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        content_range = response.headers.get('Content-Range', '')
+        if response.status_code == 206 and '/' in content_range and not content_range.endswith('*'):
+            return int(content_range.rsplit('/', 1)[1])
+        if response.status_code == 200 and response.headers.get('Content-Length'):
+            return int(response.headers['Content-Length'])
+        return sum(len(chunk) for chunk in response.iter_content(65536))
+
+
+def fetch_photo(url: str, to_memory: bool = True, timeout: float = 10):
+    """
+    Download a photo for pixel analysis
+
+    Args:
+        url: Photo URL
+        to_memory: Return the bytes; otherwise stream to a unique temp file
+        timeout: Request timeout in seconds
+
+    Returns:
+        bytes, or the path of a temp file the caller should delete
+    """
+    with get_session().get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        if to_memory:
+            return response.content
+        fd, path = tempfile.mkstemp(prefix='plant_photo_', suffix=Path(url).suffix or '.jpg')
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(65536):
+                f.write(chunk)
+        return path
+
+
+def classify_size(file_size: int) -> Tuple[str, int, str]:
+    """Size heuristic: (state, confidence, reasoning)"""
+    # Based on observations:
+    # - Light ON: 150-230KB (high detail, visible plant)
+    # - Light OFF: <50KB (mostly black pixels compress well)
+    if file_size < OFF_MAX_BYTES:
+        return ("OFF", 95, f"File size {file_size/1024:.1f}KB indicates dark image (light OFF)")
+    elif file_size > ON_MIN_BYTES:
+        return ("ON", 95, f"File size {file_size/1024:.1f}KB indicates illuminated image (light ON)")
+    else:  # 50-100KB - ambiguous
+        return ("UNKNOWN", 50, f"File size {file_size/1024:.1f}KB is ambiguous - needs visual inspection")
+
+
+@profiled("image.analyze_luminance")
+def analyze_luminance(source) -> dict:
+    """
+    Luminance statistics from a 1/8-scale JPEG decode
+
+    PIL's draft mode asks libjpeg for a scaled decode (essentially the DC
+    coefficients of each 8x8 block), so a 1920x1080 capture costs ~1-5 ms.
+
+    Args:
+        source: File path or the JPEG bytes
+
+    Returns:
+        dict with mean, dark_fraction (< DARK_LEVEL), p95 and the 256-bin histogram
+    """
+    from io import BytesIO
+    from PIL import Image
+
+    with Image.open(BytesIO(source) if isinstance(source, bytes) else source) as img:
+        img.draft('L', (max(img.width // 8, 1), max(img.height // 8, 1)))
+        histogram = img.convert('L').histogram()
+
+    total = sum(histogram)
+    mean = sum(level * count for level, count in enumerate(histogram)) / total
+    cumulative = 0
+    p95 = 255
+    for level, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= 0.95 * total:
+            p95 = level
+            break
+    return {
+        "mean": mean,
+        "dark_fraction": sum(histogram[:DARK_LEVEL]) / total,
+        "p95": p95,
+        "histogram": histogram,
+    }
+
+
+def classify_luminance(stats: dict) -> Tuple[str, int, str]:
+    """Brightness heuristic: (state, confidence, reasoning)"""
+    mean = stats["mean"]
+    if mean < OFF_MAX_MEAN:
+        return ("OFF", 95, f"Mean brightness {mean:.1f}/255 indicates dark image (light OFF)")
+    elif mean > ON_MIN_MEAN:
+        return ("ON", 95, f"Mean brightness {mean:.1f}/255 indicates illuminated image (light ON)")
+    return ("UNKNOWN", 50, f"Mean brightness {mean:.1f}/255 is ambiguous - needs visual inspection")
+
+
+def detect_light_state(photo_url_or_path, use_pixels: bool = True):
     """
     Detect if grow light is ON or OFF from a photo.
 
+    Remote photos are sized from response headers (HEAD or a ranged GET), so
+    a check costs a few hundred bytes rather than the whole JPEG. Only in the
+    ambiguous 50-100KB band is the image fetched and its luminance measured
+    from a 1/8-scale decode.
+
     Args:
         photo_url_or_path: URL or file path to photo
+        use_pixels: Resolve ambiguous sizes from pixel luminance
 
     Returns:
         tuple: (state, confidence, file_size, reasoning)
@@ -29,39 +182,146 @@ def detect_light_state(photo_url_or_path):
         file_size: size in bytes
         reasoning: explanation
     """
-    # Get file size
     if photo_url_or_path.startswith('http'):
-        # Download to get size
-        response = requests.get(photo_url_or_path)
-        file_size = len(response.content)
-        photo_path = '/tmp/temp_photo.jpg'
-        with open(photo_path, 'wb') as f:
-            f.write(response.content)
+        file_size = remote_size(photo_url_or_path)
     else:
-        photo_path = photo_url_or_path
-        file_size = os.path.getsize(photo_path)
+        file_size = os.path.getsize(photo_url_or_path)
 
-    # Size-based detection (primary heuristic)
-    # Based on observations:
-    # - Light ON: 150-230KB (high detail, visible plant)
-    # - Light OFF: <50KB (mostly black pixels compress well)
+    state, confidence, reasoning = classify_size(file_size)
+    if state == "UNKNOWN" and use_pixels:
+        if photo_url_or_path.startswith('http'):
+            stats = analyze_luminance(fetch_photo(photo_url_or_path))
+        else:
+            stats = analyze_luminance(photo_url_or_path)
+        state, confidence, pixel_reasoning = classify_luminance(stats)
+        reasoning = f"{reasoning}; {pixel_reasoning}"
+        if state != "UNKNOWN":
+            # A size already off the typical ON/OFF values lowers confidence a little
+            confidence = 85
+    return (state, confidence, file_size, reasoning)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _classify_file(path: str) -> Dict:
+    """Process-pool worker: classify one local photo (the parent has already hashed it)"""
+    try:
+        state, confidence, size, reasoning = detect_light_state(path)
+    except (OSError, ValueError) as e:
+        # Truncated or not an image: one bad file mustn't abort the batch
+        state, confidence, size, reasoning = "UNKNOWN", 0, os.path.getsize(path), f"Could not decode: {e}"
+    return {"state": state, "confidence": confidence, "size": size, "reasoning": reasoning}
+
+
+def expand_photos(patterns: List[str]) -> List[str]:
+    """Directories and globs -> sorted list of JPEG paths"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(os.path.join(pattern, name) for name in os.listdir(pattern)
+                         if name.lower().endswith(PHOTO_SUFFIXES))
+        else:
+            paths.update(path for path in glob.glob(pattern)
+                         if path.lower().endswith(PHOTO_SUFFIXES))
+    return sorted(paths)
 
-    if file_size < 50000:  # Less than 50KB
-        return ("OFF", 95, file_size,
-                f"File size {file_size/1024:.1f}KB indicates dark image (light OFF)")
-    elif file_size > 100000:  # Greater than 100KB
-        return ("ON", 95, file_size,
-                f"File size {file_size/1024:.1f}KB indicates illuminated image (light ON)")
-    else:  # 50-100KB - ambiguous
-        return ("UNKNOWN", 50, file_size,
-                f"File size {file_size/1024:.1f}KB is ambiguous - needs visual inspection")
+
+def _load_cache(cache_path: str) -> Dict:
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {"version": CACHE_VERSION, "results": {}, "files": {}}
+
+
+def classify_batch(paths: List[str], workers: Optional[int] = None,
+                   cache_path: Optional[str] = CACHE_FILE) -> Dict[str, Dict]:
+    """
+    Classify many local photos, in parallel, reusing cached results
+
+    Results are cached by SHA-256 of the file contents, so renamed or copied
+    photos are never classified twice. A path whose size and mtime are
+    unchanged since the last run isn't even re-hashed.
+
+    Args:
+        paths: Local photo paths
+        workers: Process pool size (default: CPU count)
+        cache_path: JSON cache file (None to disable caching)
+
+    Returns:
+        dict of path -> {state, confidence, size, reasoning, sha256}
+    """
+    cache = _load_cache(cache_path) if cache_path else {"version": CACHE_VERSION, "results": {}, "files": {}}
+    results, files = cache["results"], cache["files"]
+
+    out = {}
+    todo: Dict[str, List[str]] = {}  # sha -> paths with those contents, classified once
+    unhashed = []
+    for path in paths:
+        st = os.stat(path)
+        known = files.get(os.path.abspath(path))
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns \
+                and known["sha256"] in results:
+            out[path] = dict(results[known["sha256"]], sha256=known["sha256"])
+        else:
+            unhashed.append(path)
+
+    # Hash the changed/new files first; only contents never seen before are decoded
+    for path in unhashed:
+        sha = file_sha256(path)
+        st = os.stat(path)
+        files[os.path.abspath(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+        if sha in results:
+            out[path] = dict(results[sha], sha256=sha)
+        else:
+            todo.setdefault(sha, []).append(path)
+
+    shas = list(todo)
+    firsts = [todo[sha][0] for sha in shas]
+    if len(firsts) <= INLINE_BATCH or workers == 1:
+        classified = list(map(_classify_file, firsts))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk = max(len(firsts) // (4 * (workers or os.cpu_count() or 1)), 1)
+            classified = list(pool.map(_classify_file, firsts, chunksize=chunk))
+    for sha, result in zip(shas, classified):
+        results[sha] = result
+        for path in todo[sha]:
+            out[path] = dict(result, sha256=sha)
+
+    if cache_path and unhashed:
+        tmp = f"{cache_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp, cache_path)
+    return out
 
 
 def main():
     if len(sys.argv) < 2:
         print("Usage: light_detector.py <photo_url_or_path>")
+        print("       light_detector.py --batch <dir|glob> [...]")
         sys.exit(1)
 
+    if sys.argv[1] == "--batch":
+        results = classify_batch(expand_photos(sys.argv[2:] or ["."]))
+        counts = {}
+        for path, result in results.items():
+            counts[result["state"]] = counts.get(result["state"], 0) + 1
+            print(f"{result['state']:<8} {result['confidence']:3d}%  {result['size']/1024:6.1f}KB  {path}")
+        print(f"\n{len(results)} photos: " + ", ".join(f"{n} {state}" for state, n in sorted(counts.items())))
+        sys.exit(0)
+
     photo = sys.argv[1]
     state, confidence, size, reasoning = detect_light_state(photo)
 
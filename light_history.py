@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Interval index over grow light history.
+
+Light sessions are kept as sorted, non-overlapping [on, off) intervals with a
+prefix sum of lit seconds, so
+
+- lit minutes between any t1 and t2
+- whether the light is on at t
+- per-day totals / photoperiod compliance
+
+are two binary searches each, O(log n), however many months of history are
+loaded. Sessions are normally appended in time order (O(1)); an out-of-order
+or overlapping session is merged in and the prefix sums rebuilt.
+
+Usage:
+    python light_history.py <history.json> [daily-target-minutes]
+"""
+
+import sys
+import json
+import numbers
+from bisect import bisect_right
+from datetime import datetime, date, timedelta, timezone
+from typing import List, Tuple, Dict, Optional
+
+DAILY_TARGET_MINUTES = 840
+
+
+def _epoch(timestamp) -> float:
+    if isinstance(timestamp, numbers.Real):  # includes numpy scalars
+        return float(timestamp)
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _day_bounds(day: date) -> Tuple[float, float]:
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).timestamp()
+    return start, start + 86400
+
+
+class LightHistoryIndex:
+    """Sorted on/off intervals with prefix sums of lit time"""
+
+    def __init__(self, intervals=()):
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        self._prefix: List[float] = [0.0]  # lit seconds before interval i
+        for start, end in sorted((_epoch(s), _epoch(e)) for s, e in intervals):
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self._starts)
+
+    # --- Building ----------------------------------------------------------
+
+    def add(self, start, end):
+        """Add a lit interval [start, end)"""
+        start, end = _epoch(start), _epoch(end)
+        if end <= start:
+            return
+        if not self._starts or start > self._ends[-1]:
+            self._starts.append(start)
+            self._ends.append(end)
+            self._prefix.append(self._prefix[-1] + end - start)
+        elif start >= self._starts[-1]:
+            # Overlaps / touches the last interval: extend it
+            if end > self._ends[-1]:
+                self._prefix[-1] += end - self._ends[-1]
+                self._ends[-1] = end
+        else:
+            self._merge(start, end)
+
+    def _merge(self, start: float, end: float):
+        intervals = sorted(zip(self._starts + [start], self._ends + [end]))
+        self._starts, self._ends, self._prefix = [], [], [0.0]
+        for s, e in intervals:
+            self.add(s, e)
+
+    def add_session(self, response: Dict, at=None):
+        """Add a turn_on_light response (off_at) switched on at `at` (default: now)"""
+        at = datetime.now(timezone.utc) if at is None else at
+        self.add(at, response["off_at"])
+
+    def add_history(self, entries: List[Dict]):
+        """
+        Add get_light_history entries
+
+        Each entry needs a start ("on_at" / "start" / "timestamp") and either an
+        end ("off_at" / "end") or a duration ("duration_minutes" / "minutes").
+        """
+        for entry in sorted(entries, key=lambda e: _epoch(e.get("on_at") or e.get("start") or e["timestamp"])):
+            start = _epoch(entry.get("on_at") or entry.get("start") or entry["timestamp"])
+            end = entry.get("off_at") or entry.get("end")
+            if end is not None:
+                end = _epoch(end)
+            else:
+                end = start + 60 * float(entry.get("duration_minutes", entry.get("minutes", 0)))
+            self.add(start, end)
+
+    # --- Queries -----------------------------------------------------------
+
+    def lit_seconds_before(self, t) -> float:
+        """Total lit seconds before t"""
+        t = _epoch(t)
+        i = bisect_right(self._starts, t)
+        if i == 0:
+            return 0.0
+        return self._prefix[i - 1] + min(t, self._ends[i - 1]) - self._starts[i - 1]
+
+    def lit_minutes(self, t1, t2) -> float:
+        """Minutes of light between t1 and t2"""
+        return (self.lit_seconds_before(t2) - self.lit_seconds_before(t1)) / 60
+
+    def is_lit(self, t) -> bool:
+        t = _epoch(t)
+        i = bisect_right(self._starts, t)
+        return i > 0 and t < self._ends[i - 1]
+
+    def day_total(self, day: date) -> float:
+        """Lit minutes on a UTC day"""
+        return self.lit_minutes(*_day_bounds(day))
+
+    def daily_totals(self, first: date, last: date) -> Dict[str, float]:
+        """Lit minutes per UTC day from first to last inclusive"""
+        totals = {}
+        day = first
+        while day <= last:
+            totals[day.isoformat()] = round(self.day_total(day), 1)
+            day += timedelta(days=1)
+        return totals
+
+    def compliance(self, first: date, last: date, target_minutes: float = DAILY_TARGET_MINUTES) -> Dict:
+        """How many days from first to last met the photoperiod target"""
+        totals = self.daily_totals(first, last)
+        short = {day: minutes for day, minutes in totals.items() if minutes < target_minutes}
+        return {
+            "days": len(totals),
+            "days_met": len(totals) - len(short),
+            "target_minutes": target_minutes,
+            "short_days": short,
+        }
+
+    def lit_seconds_before_many(self, times):
+        """Vectorized lit_seconds_before over an array of epoch seconds"""
+        import numpy as np
+        times = np.asarray(times, dtype=np.float64)
+        if not self._starts:
+            return np.zeros(times.shape)
+        starts = np.asarray(self._starts)
+        ends = np.asarray(self._ends)
+        prefix = np.asarray(self._prefix)
+        i = np.searchsorted(starts, times, side='right')
+        prev = np.maximum(i - 1, 0)
+        within = np.minimum(times, ends[prev]) - starts[prev]
+        return np.where(i > 0, prefix[prev] + within, 0.0)
+
+    def span(self) -> Optional[Tuple[date, date]]:
+        """First and last UTC day covered by the history"""
+        if not self._starts:
+            return None
+        return (datetime.fromtimestamp(self._starts[0], timezone.utc).date(),
+                datetime.fromtimestamp(self._ends[-1], timezone.utc).date())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r') as f:
+            data = json.load(f)
+    else:
+        data = json.load(sys.stdin)
+    target = float(sys.argv[2]) if len(sys.argv) > 2 else DAILY_TARGET_MINUTES
+
+    index = LightHistoryIndex()
+    index.add_history(data)
+    if index.span() is None:
+        print("No light history")
+        sys.exit(0)
+
+    first, last = index.span()
+    for day, minutes in index.daily_totals(first, last).items():
+        mark = "✓" if minutes >= target else "✗"
+        print(f"{day}: {minutes:6.1f} min {mark}")
+    result = index.compliance(first, last, target)
+    print(f"\n{result['days_met']}/{result['days']} days met the {target:.0f} min target")
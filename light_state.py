@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Client-side grow light state machine.
+
+The light is always in one of three states, all derived from one timestamp:
+
+    OFF                      no session, can activate now
+    ON        until off_at   auto-shutoff at off_at
+    COOLDOWN  until off_at + cooldown
+
+turn_on_light already returns off_at, so after each command the tracker knows
+the exact moment the light goes off and becomes available again. Availability
+questions are answered locally; get_light_status is only needed for an
+occasional reconciliation (e.g. at start-up or after a manual override).
+
+Usage:
+    python light_state.py <off_at-iso> [now-iso]
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+OFF = "OFF"
+ON = "ON"
+COOLDOWN = "COOLDOWN"
+
+COOLDOWN_MINUTES = 30
+
+
+def _parse(timestamp) -> Optional[datetime]:
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, datetime):
+        return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LightStateTracker:
+    """Track OFF / ON / COOLDOWN locally from command responses"""
+
+    def __init__(self, cooldown_minutes: float = COOLDOWN_MINUTES):
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+        self.off_at: Optional[datetime] = None
+        self.on_at: Optional[datetime] = None
+        self.synced_at: Optional[datetime] = None
+
+    # --- Updates -----------------------------------------------------------
+
+    def light_on(self, response: Dict, at=None):
+        """
+        Record a turn_on_light response
+
+        Args:
+            response: The command response (needs "off_at")
+            at: When the command was sent (default: now)
+        """
+        at = _parse(at) or _now()
+        self.on_at = at
+        self.off_at = _parse(response["off_at"])
+        self.synced_at = at
+
+    def light_off(self, at=None):
+        """Record a manual switch-off; the cooldown starts now"""
+        at = _parse(at) or _now()
+        if self.off_at is None or self.off_at > at:
+            self.off_at = at
+        self.synced_at = at
+
+    def reconcile(self, status: Dict, at=None):
+        """
+        Correct the local state from a get_light_status response
+
+        Uses off_at when the server reports it, otherwise rebuilds it from
+        is_on / minutes_until_available.
+        """
+        at = _parse(at) or _now()
+        self.synced_at = at
+        if status.get("off_at"):
+            self.off_at = _parse(status["off_at"])
+        elif status.get("is_on") or status.get("status") == "on":
+            remaining = status.get("minutes_remaining")
+            wait = status.get("minutes_until_available")
+            if remaining is not None:
+                self.off_at = at + timedelta(minutes=remaining)
+            elif wait is not None:
+                # Available again = off_at + cooldown
+                self.off_at = max(at + timedelta(minutes=wait) - self.cooldown, at)
+            elif self.off_at is None or self.off_at <= at:
+                # On, but no end time reported: never treat it as available
+                self.off_at = at
+        elif status.get("can_activate", True):
+            if self.off_at is not None and self.off_at + self.cooldown > at:
+                self.off_at = at - self.cooldown
+        else:
+            wait = status.get("minutes_until_available")
+            if wait is None:
+                # Unavailable for an unknown time: assume a full cooldown from now
+                self.off_at = at
+            else:
+                self.off_at = at + timedelta(minutes=wait) - self.cooldown
+
+    # --- Queries -----------------------------------------------------------
+
+    def state(self, now=None) -> str:
+        now = _parse(now) or _now()
+        if self.off_at is None or now >= self.off_at + self.cooldown:
+            return OFF
+        return ON if now < self.off_at else COOLDOWN
+
+    def available_at(self, now=None) -> datetime:
+        """Earliest time the light can be switched on"""
+        now = _parse(now) or _now()
+        if self.off_at is None:
+            return now
+        return max(now, self.off_at + self.cooldown)
+
+    def can_activate(self, now=None) -> bool:
+        return self.state(now) == OFF
+
+    def minutes_until_available(self, now=None) -> float:
+        now = _parse(now) or _now()
+        return (self.available_at(now) - now).total_seconds() / 60
+
+    def next_transition(self, now=None) -> Optional[datetime]:
+        """Exact time of the next state change (the wake-up time), or None when OFF"""
+        now = _parse(now) or _now()
+        state = self.state(now)
+        if state == ON:
+            return self.off_at
+        if state == COOLDOWN:
+            return self.off_at + self.cooldown
+        return None
+
+    def needs_reconcile(self, max_age_minutes: float = 360, now=None) -> bool:
+        """True if the state has never been confirmed or was last confirmed too long ago"""
+        now = _parse(now) or _now()
+        return self.synced_at is None or (now - self.synced_at) > timedelta(minutes=max_age_minutes)
+
+    def status(self, now=None) -> Dict:
+        """Local equivalent of get_light_status"""
+        now = _parse(now) or _now()
+        state = self.state(now)
+        return {
+            "state": state,
+            "is_on": state == ON,
+            "can_activate": state == OFF,
+            "minutes_until_available": round(self.minutes_until_available(now), 1),
+            "off_at": self.off_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.off_at else None,
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: light_state.py <off_at-iso> [now-iso]")
+        sys.exit(1)
+
+    tracker = LightStateTracker()
+    tracker.light_on({"off_at": sys.argv[1]})
+    now = sys.argv[2] if len(sys.argv) > 2 else None
+    status = tracker.status(now)
+    print(f"State: {status['state']}")
+    print(f"Can activate: {status['can_activate']}")
+    print(f"Minutes until available: {status['minutes_until_available']}")
+    wake = tracker.next_transition(now)
+    if wake:
+        print(f"Next change: {wake.strftime('%Y-%m-%d %H:%M:%S')} UTC")
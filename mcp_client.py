@@ -7,6 +7,8 @@ import json
 import uuid
 from datetime import datetime
 
+from profiling import profiled
+
 print(f"=== MCP Direct Client - {datetime.now().isoformat()} ===\n")
 
 mcp_url = "http://localhost:8000/mcp"
@@ -27,6 +29,7 @@ def parse_sse_response(text):
         return json.loads(data_lines[0])
     return None
 
+@profiled("mcp.send_request")
 def send_request(method, params=None):
     """Send JSON-RPC request to MCP server"""
     request = {
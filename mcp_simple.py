@@ -7,11 +7,14 @@ import json
 import uuid
 from datetime import datetime
 
+from profiling import profiled
+
 print(f"=== Simple MCP Client - {datetime.now().isoformat()} ===\n")
 
 BASE_URL = "http://localhost:8000"
 session_id = str(uuid.uuid4())
 
+@profiled("mcp.call_mcp")
 def call_mcp(method, params=None):
     """Call MCP with proper session management"""
     url = f"{BASE_URL}/mcp"
@@ -8,6 +8,9 @@ import sys
 import json
 from datetime import datetime, timedelta
 
+from profiling import profiled
+
+@profiled("trend.analyze_moisture_trend")
 def analyze_moisture_trend(history_data):
     """
     Analyze moisture sensor readings to detect trends.
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Soil moisture & reservoir simulator - synthetic long-run histories
+
+Models what we have seen in the real data:
+- Evaporation: soil water decays exponentially, faster while the grow light is on
+- Self-watering reservoir: wicks water up to an equilibrium level until it runs dry
+  (switched per day, from the dawn soil level). The equilibrium sits above the
+  dawn threshold, so while the reservoir holds water the soil never needs a dose
+- Dose response: dawn watering protocol (>=2170 -> 20ml) refills the reservoir,
+  anything past its capacity spills into the soil
+- Sensor: linear ADC mapping (1100 wet / 3400 dry) plus the C3 style oscillation
+  (~76 min cycle, +/-4 points) and +/-3 points of jitter
+
+The light schedule repeats daily, so the per-step decay factors are identical for
+every day. Each day is solved in closed form for all steps (and all Monte Carlo
+runs) at once; only the dawn watering decision is sequential, one Python
+iteration per simulated day.
+
+Output readings are [timestamp, value] pairs, the same format that
+moisture_analysis.analyze_moisture_trend and MoistureTrendAnalyzer.analyze_trend
+already accept.
+"""
+
+import sys
+import json
+import numpy as np
+from datetime import datetime
+from typing import List, Tuple, Dict, Optional
+
+from sensor_calibration import SENSOR_WET, SENSOR_DRY
+
+MINUTES_PER_DAY = 1440
+
+# Protocol light schedule: 7 x 120min with 30min cooldowns from 06:00 (840 min)
+DEFAULT_LIGHT_SESSIONS = [(360 + i * 150, 120) for i in range(7)]
+
+
+class MoistureSimulator:
+    """Vectorized simulator for soil moisture, reservoir level and sensor output"""
+
+    def __init__(self,
+                 wet_reference=SENSOR_WET,
+                 dry_reference=SENSOR_DRY,
+                 soil_capacity_ml=400.0,
+                 evaporation_per_hour=0.0008,
+                 light_evaporation_per_hour=0.0006,
+                 wick_rate_per_hour=0.02,
+                 wick_equilibrium_ml=240.0,
+                 reservoir_capacity_ml=150.0,
+                 dawn_minute=300,
+                 dawn_threshold=2170,
+                 dose_ml=20.0,
+                 light_sessions=None,
+                 oscillation_amplitude=4.0,
+                 oscillation_period_minutes=76.0,
+                 noise_std=2.5):
+        self.wet_ref = wet_reference
+        self.dry_ref = dry_reference
+        self.soil_capacity = soil_capacity_ml
+        self.evaporation = evaporation_per_hour
+        self.light_evaporation = light_evaporation_per_hour
+        self.wick_rate = wick_rate_per_hour
+        self.wick_equilibrium = wick_equilibrium_ml
+        self.reservoir_capacity = reservoir_capacity_ml
+        self.dawn_minute = dawn_minute
+        self.dawn_threshold = dawn_threshold
+        self.dose_ml = dose_ml
+        self.light_sessions = light_sessions if light_sessions is not None else DEFAULT_LIGHT_SESSIONS
+        self.oscillation_amplitude = oscillation_amplitude
+        self.oscillation_period = oscillation_period_minutes
+        self.noise_std = noise_std
+
+    def light_profile(self, step_minutes: int = 1) -> np.ndarray:
+        """Fraction of each step that the light is on, for one day starting at dawn"""
+        lit = np.zeros(MINUTES_PER_DAY, dtype=bool)
+        for start, duration in self.light_sessions:
+            idx = np.arange(start, start + duration) % MINUTES_PER_DAY
+            lit[idx] = True
+        lit = np.roll(lit, -self.dawn_minute)
+        return lit.reshape(-1, step_minutes).mean(axis=1)
+
+    def water_to_sensor(self, water_ml):
+        """Map soil water (ml) to a raw sensor value (higher = drier)"""
+        fraction = np.clip(water_ml / self.soil_capacity, 0.0, 1.0)
+        return self.dry_ref - (self.dry_ref - self.wet_ref) * fraction
+
+    def simulate(self,
+                 days: int = 365,
+                 runs: int = 1,
+                 step_minutes: int = 1,
+                 start: str = "2025-10-22T05:00:00Z",
+                 initial_water_ml=200.0,
+                 initial_reservoir_ml=100.0,
+                 parameter_jitter: float = 0.0,
+                 seed: Optional[int] = None) -> "SimulationResult":
+        """
+        Simulate `runs` independent histories of `days` days
+
+        Args:
+            days: Number of simulated days
+            runs: Number of Monte Carlo runs (simulated in parallel)
+            step_minutes: Output resolution, must divide 1440
+            start: ISO timestamp of the first dawn (first sample)
+            initial_water_ml: Starting soil water, scalar or per-run array
+            initial_reservoir_ml: Starting reservoir level, scalar or per-run array
+            parameter_jitter: Relative std-dev applied per run to evaporation and wick rates
+            seed: RNG seed for reproducible runs
+
+        Returns:
+            SimulationResult with sensor values of shape (runs, samples)
+        """
+        if MINUTES_PER_DAY % step_minutes:
+            raise ValueError(f"step_minutes must divide {MINUTES_PER_DAY}, got {step_minutes}")
+
+        rng = np.random.default_rng(seed)
+        steps = MINUTES_PER_DAY // step_minutes
+        dt = step_minutes / 60.0
+
+        def per_run(rate):
+            if parameter_jitter <= 0:
+                return np.full((runs, 1), rate)
+            factor = rng.normal(1.0, parameter_jitter, size=(runs, 1))
+            return rate * np.clip(factor, 0.1, None)
+
+        evaporation = per_run(self.evaporation)
+        light_evaporation = per_run(self.light_evaporation)
+        wick = per_run(self.wick_rate)
+        lit = self.light_profile(step_minutes)[None, :]
+
+        # Exact per-step solution: w[n+1] = a[n] * w[n] + b[n].
+        # Unrolled over a day: w[n] = A[n] * w0 + AC[n], with A = cumprod(a).
+        def day_kernel(wick_rate):
+            k = evaporation + light_evaporation * lit + wick_rate
+            a = np.exp(-k * dt)
+            inflow = wick_rate * self.wick_equilibrium
+            # k == 0 (no drying, no wick): linear limit of inflow * (1 - a) / k
+            with np.errstate(divide='ignore', invalid='ignore'):
+                b = np.where(k > 0, inflow * (1.0 - a) / k, inflow * dt)
+            A = np.exp(np.cumsum(np.log(a), axis=1) - np.log(a))
+            C = np.cumsum(b / (A * a), axis=1) - b / (A * a)
+            return A, A * C, a[:, -1], b[:, -1]
+
+        with_reservoir = day_kernel(wick)
+        without_reservoir = day_kernel(np.zeros_like(wick))
+
+        water = np.broadcast_to(np.asarray(initial_water_ml, dtype=float), (runs,)).copy()
+        reservoir = np.broadcast_to(np.asarray(initial_reservoir_ml, dtype=float), (runs,)).copy()
+
+        soil = np.empty((runs, days * steps), dtype=np.float32)
+        watered = np.zeros((runs, days), dtype=np.float32)
+        reservoir_levels = np.empty((runs, days), dtype=np.float32)
+
+        for day in range(days):
+            # Dawn decision: the dose refills the reservoir, any spill goes to the soil
+            dose = np.where(self.water_to_sensor(water) >= self.dawn_threshold, self.dose_ml, 0.0)
+            reservoir = reservoir + dose
+            spill = np.maximum(reservoir - self.reservoir_capacity, 0.0)
+            reservoir -= spill
+            water = np.minimum(water + spill, self.soil_capacity)
+            watered[:, day] = dose
+            reservoir_levels[:, day] = reservoir
+
+            # The wick only feeds soil that is drier than its equilibrium
+            wicking = (reservoir > 0) & (water < self.wick_equilibrium)
+            mask = wicking[:, None]
+            A = np.where(mask, with_reservoir[0], without_reservoir[0])
+            AC = np.where(mask, with_reservoir[1], without_reservoir[1])
+            day_water = A * water[:, None] + AC
+            soil[:, day * steps:(day + 1) * steps] = day_water
+
+            transfer = wick[:, 0] * wicking * dt * np.maximum(self.wick_equilibrium - day_water, 0.0).sum(axis=1)
+            reservoir = np.clip(reservoir - transfer, 0.0, self.reservoir_capacity)
+            water = (np.where(wicking, with_reservoir[2], without_reservoir[2]) * day_water[:, -1]
+                     + np.where(wicking, with_reservoir[3], without_reservoir[3]))
+
+        sensor = self.water_to_sensor(soil)
+
+        minutes = np.arange(days * steps) * step_minutes
+        if self.oscillation_amplitude:
+            phase = rng.uniform(0, 2 * np.pi, size=(runs, 1))
+            sensor += self.oscillation_amplitude * np.sin(2 * np.pi * minutes / self.oscillation_period + phase)
+        if self.noise_std:
+            sensor += rng.normal(0.0, self.noise_std, size=sensor.shape)
+
+        start_dt = datetime.fromisoformat(start.replace('Z', '+00:00')).replace(tzinfo=None)
+        timestamps = np.datetime64(start_dt, 's') + (minutes * 60).astype('timedelta64[s]')
+        light_on = np.tile(self.light_profile(step_minutes) > 0, days)
+
+        return SimulationResult(timestamps, np.rint(sensor).astype(np.int32), soil,
+                                watered, reservoir_levels, light_on)
+
+
+class SimulationResult:
+    """Simulated histories: sensor values plus the hidden state that produced them"""
+
+    def __init__(self, timestamps, values, soil_water, watered_ml, reservoir_ml, light_on):
+        self.timestamps = timestamps          # datetime64[s], shape (samples,)
+        self.values = values                  # int32 sensor readings, shape (runs, samples)
+        self.soil_water = soil_water          # float32 ml, shape (runs, samples)
+        self.watered_ml = watered_ml          # float32 dawn doses, shape (runs, days)
+        self.reservoir_ml = reservoir_ml      # float32 post-dose level, shape (runs, days)
+        self.light_on = light_on              # bool, shape (samples,)
+
+    @property
+    def runs(self) -> int:
+        return self.values.shape[0]
+
+    def iso_timestamps(self) -> np.ndarray:
+        """Timestamps as ISO strings with a Z suffix, as stored by the plant server"""
+        return np.char.add(np.datetime_as_string(self.timestamps, unit='s'), 'Z')
+
+    def to_readings(self, run: int = 0, every: int = 1) -> List[Tuple[str, int]]:
+        """Readings for one run as [(timestamp, value), ...] for the existing analyzers"""
+        stamps = self.iso_timestamps()[::every].tolist()
+        values = self.values[run, ::every].tolist()
+        return list(zip(stamps, values))
+
+    def summary(self) -> Dict:
+        """Aggregate statistics across all runs"""
+        return {
+            "runs": self.runs,
+            "samples_per_run": int(self.values.shape[1]),
+            "days": int(self.watered_ml.shape[1]),
+            "mean_value": round(float(self.values.mean()), 1),
+            "min_value": int(self.values.min()),
+            "max_value": int(self.values.max()),
+            "mean_water_per_day_ml": round(float(self.watered_ml.sum(axis=1).mean() / max(self.watered_ml.shape[1], 1)), 2),
+            "mean_waterings": round(float((self.watered_ml > 0).sum(axis=1).mean()), 1),
+            "reservoir_empty_fraction": round(float((self.reservoir_ml <= 0).mean()), 3),
+        }
+
+
+if __name__ == "__main__":
+    # Usage: moisture_simulator.py [days] [step_minutes]
+    # Prints readings as JSON, e.g. `moisture_simulator.py 3 15 | python moisture_analysis.py`
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    step = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    result = MoistureSimulator().simulate(days=days, step_minutes=step, seed=0)
+    json.dump(result.to_readings(), sys.stdout)
+    print()
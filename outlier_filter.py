@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Streaming outlier filter for moisture readings.
+
+Readings jitter by +/-3-8 points and single spikes can flip the trend
+classification. This stage keeps a running median and MAD (median absolute
+deviation) over a sliding time window and flags readings that sit too far
+from the median, optionally replacing them with the median before the data
+reaches the analyzers.
+
+The window is held in an indexable skiplist, so each reading costs
+O(log w) to insert/evict and the median is an O(log w) index lookup.
+The MAD is the k-th smallest distance from the median, found by a
+binary-search selection over the two sorted halves of the window
+(O(log^2 w)), so windows are never re-sorted.
+
+Usage:
+    python outlier_filter.py data.json | python moisture_analysis.py
+"""
+
+import sys
+import json
+import random
+from collections import deque
+from datetime import datetime
+from typing import List, Tuple, Dict, Optional
+
+# Scale factor making MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+
+
+class IndexableSkiplist:
+    """Sorted multiset with O(log n) insert, remove and positional access"""
+
+    _MAX_LEVELS = 24
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._size = 0
+        self._top = 1
+        # Each node: [value, next_nodes, widths]
+        self._head = [None, [None] * self._MAX_LEVELS, [1] * self._MAX_LEVELS]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("skiplist index out of range")
+        node = self._head
+        i += 1
+        for level in reversed(range(self._top)):
+            while node[1][level] is not None and node[2][level] <= i:
+                i -= node[2][level]
+                node = node[1][level]
+        return node[0]
+
+    def __iter__(self):
+        node = self._head[1][0]
+        while node is not None:
+            yield node[0]
+            node = node[1][0]
+
+    def _random_levels(self) -> int:
+        levels = 1
+        while levels < self._MAX_LEVELS and self._rng.random() < 0.5:
+            levels += 1
+        return levels
+
+    def insert(self, value):
+        chain = [self._head] * self._MAX_LEVELS
+        steps_at_level = [0] * self._MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self._top)):
+            while node[1][level] is not None and node[1][level][0] <= value:
+                steps_at_level[level] += node[2][level]
+                node = node[1][level]
+            chain[level] = node
+
+        levels = self._random_levels()
+        self._top = max(self._top, levels)
+        new_node = [value, [None] * levels, [None] * levels]
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new_node[1][level] = prev[1][level]
+            prev[1][level] = new_node
+            new_node[2][level] = prev[2][level] - steps
+            prev[2][level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self._MAX_LEVELS):
+            chain[level][2][level] += 1
+        self._size += 1
+
+    def remove(self, value):
+        chain = [self._head] * self._MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self._top)):
+            while node[1][level] is not None and node[1][level][0] < value:
+                node = node[1][level]
+            chain[level] = node
+
+        target = chain[0][1][0]
+        if target is None or target[0] != value:
+            raise KeyError(f"{value!r} not in skiplist")
+        for level in range(len(target[1])):
+            prev = chain[level]
+            prev[2][level] += target[2][level] - 1
+            prev[1][level] = target[1][level]
+        for level in range(len(target[1]), self._MAX_LEVELS):
+            chain[level][2][level] -= 1
+        self._size -= 1
+
+
+class RunningMedianMAD:
+    """Median and MAD of the readings within a sliding time window"""
+
+    def __init__(self, window_minutes: float = 60):
+        self.window_seconds = window_minutes * 60
+        self._times = deque()
+        self._sorted = IndexableSkiplist(seed=0)
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def add(self, t: float, value: float):
+        """Add a reading at epoch seconds t and evict readings older than the window"""
+        self._times.append((t, value))
+        self._sorted.insert(value)
+        cutoff = t - self.window_seconds
+        while self._times and self._times[0][0] <= cutoff:
+            _, old = self._times.popleft()
+            self._sorted.remove(old)
+
+    def median(self) -> Optional[float]:
+        n = len(self._sorted)
+        if n == 0:
+            return None
+        if n % 2:
+            return self._sorted[n // 2]
+        return (self._sorted[n // 2 - 1] + self._sorted[n // 2]) / 2
+
+    def mad(self) -> Optional[float]:
+        """Median of |x - median| without materialising the deviations"""
+        n = len(self._sorted)
+        if n == 0:
+            return None
+        m = self.median()
+        if n % 2:
+            return self._kth_deviation(m, n // 2)
+        return (self._kth_deviation(m, n // 2 - 1) + self._kth_deviation(m, n // 2)) / 2
+
+    def _kth_deviation(self, m: float, k: int) -> float:
+        """
+        k-th smallest (0-based) of |x - m| over the window.
+
+        Values below the split point, read backwards, and values from the
+        split point onward form two ascending deviation sequences; select the
+        k-th element of their merge by binary search.
+        """
+        s = self._sorted
+        n = len(s)
+        # Split point: first index whose value is >= m
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if s[mid] < m:
+                lo = mid + 1
+            else:
+                hi = mid
+        split = lo
+        left_len, right_len = split, n - split
+
+        def left(i):
+            return m - s[split - 1 - i]
+
+        def right(j):
+            return s[split + j] - m
+
+        # Number of elements taken from the left sequence: i in [lo, hi]
+        lo, hi = max(0, k + 1 - right_len), min(k + 1, left_len)
+        while lo < hi:
+            i = (lo + hi) // 2
+            j = k + 1 - i
+            if j > 0 and i < left_len and right(j - 1) > left(i):
+                lo = i + 1
+            else:
+                hi = i
+        i = lo
+        j = k + 1 - i
+        candidates = []
+        if i > 0:
+            candidates.append(left(i - 1))
+        if j > 0:
+            candidates.append(right(j - 1))
+        return max(candidates)
+
+
+class OutlierFilter:
+    """Flag (and optionally replace) readings far from the running median"""
+
+    def __init__(self,
+                 window_minutes: float = 60,
+                 threshold: float = 3.5,
+                 min_deviation: float = 10,
+                 min_samples: int = 5,
+                 replace: bool = True):
+        """
+        Args:
+            window_minutes: Length of the trailing window
+            threshold: Outlier if |x - median| > threshold * 1.4826 * MAD
+            min_deviation: Never flag deviations at or below this many points
+                           (normal sensor jitter is +/-3-8 points)
+            min_samples: Pass readings through until the window has this many
+            replace: Replace flagged readings with the running median
+        """
+        self.window = RunningMedianMAD(window_minutes)
+        self.threshold = threshold
+        self.min_deviation = min_deviation
+        self.min_samples = min_samples
+        self.replace = replace
+
+    def process(self, timestamp, value: float) -> Dict:
+        """
+        Filter one reading against the window of earlier readings
+
+        Args:
+            timestamp: ISO timestamp string or datetime
+            value: Raw sensor reading
+
+        Returns:
+            dict with the raw and filtered value plus the window statistics
+            (mad is only computed when the reading exceeds min_deviation)
+        """
+        t = _epoch_seconds(timestamp)
+        median = mad = None
+        outlier = False
+        if len(self.window) >= self.min_samples:
+            median = self.window.median()
+            # Within normal jitter the MAD can't matter, so skip the selection
+            if abs(value - median) > self.min_deviation:
+                mad = self.window.mad()
+                outlier = abs(value - median) > self.threshold * MAD_SCALE * mad
+
+        # Outliers still enter the window; the median is robust to them and a
+        # genuine step change (e.g. watering) becomes the new baseline.
+        self.window.add(t, value)
+
+        filtered = value
+        if outlier and self.replace:
+            filtered = median if isinstance(value, float) else int(round(median))
+        return {
+            "timestamp": timestamp,
+            "value": value,
+            "filtered_value": filtered,
+            "median": median,
+            "mad": mad,
+            "outlier": outlier,
+        }
+
+    def filter(self, readings: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+        """
+        Filter a list of (timestamp, value) readings in time order
+
+        Outliers are replaced with the running median, or dropped when
+        replace=False. The output feeds straight into the analyzers.
+        """
+        cleaned = []
+        for timestamp, value in readings:
+            result = self.process(timestamp, value)
+            if result["outlier"] and not self.replace:
+                continue
+            cleaned.append((timestamp, result["filtered_value"]))
+        return cleaned
+
+
+def _epoch_seconds(timestamp) -> float:
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+
+
+def filter_readings(readings, window_minutes=60, replace=True) -> List[Tuple[str, float]]:
+    """Convenience wrapper: robustly filter readings sorted by timestamp"""
+    readings = sorted(readings, key=lambda r: _epoch_seconds(r[0]))
+    return OutlierFilter(window_minutes=window_minutes, replace=replace).filter(readings)
+
+
+if __name__ == "__main__":
+    # Read JSON [[timestamp, value], ...] from a file or stdin, write filtered JSON
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r') as f:
+            data = json.load(f)
+    else:
+        data = json.load(sys.stdin)
+
+    print(json.dumps([list(r) for r in filter_readings(data)]))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Perceptual hashing and near-duplicate search for plant photos.
+
+dhash() reduces a photo to a 64-bit difference hash (9x8 greyscale, one bit
+per horizontal gradient sign); captures that look the same differ in only a
+few bits. BKTree indexes hashes by Hamming distance, so "everything within d
+bits of this photo" only visits a small part of the tree, even with tens of
+thousands of photos.
+
+skip_similar() drops frames that match the previously kept frame, which is
+what growth metrics, health scoring and time-lapses want from the bursts of
+near-identical verification photos taken around each light session.
+
+Usage:
+    python perceptual_hash.py <photo.jpg> [<photo.jpg> ...]
+"""
+
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+HASH_SIZE = 8
+SIMILAR_BITS = 6  # <= this many differing bits counts as the same scene
+
+
+def dhash(source, hash_size: int = HASH_SIZE) -> int:
+    """
+    Difference hash of an image
+
+    Args:
+        source: File path, file object or PIL image
+        hash_size: Hash is hash_size^2 bits
+
+    Returns:
+        The hash as a non-negative int
+    """
+    from PIL import Image
+
+    img = source if isinstance(source, Image.Image) else Image.open(source)
+    try:
+        if img.format == 'JPEG':
+            img.draft('L', (hash_size * 8, hash_size * 8))
+        small = img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    finally:
+        if img is not source:
+            img.close()
+
+    pixels = small.tobytes()
+    bits = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over hashes under Hamming distance"""
+
+    def __init__(self, items: Iterable[Tuple[int, object]] = ()):
+        self._root = None  # (hash, [values], {distance: child})
+        self._size = 0
+        for value_hash, value in items:
+            self.add(value_hash, value)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value_hash: int, value):
+        self._size += 1
+        if self._root is None:
+            self._root = (value_hash, [value], {})
+            return
+        node = self._root
+        while True:
+            distance = hamming(value_hash, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value_hash, [value], {})
+                return
+            node = child
+
+    def search(self, value_hash: int, radius: int) -> List[Tuple[int, object]]:
+        """All (distance, value) within `radius` bits, nearest first"""
+        found = []
+        if self._root is None:
+            return found
+        stack = [self._root]
+        while stack:
+            node_hash, values, children = stack.pop()
+            distance = hamming(value_hash, node_hash)
+            if distance <= radius:
+                found.extend((distance, value) for value in values)
+            # Triangle inequality: only children keyed within distance +- radius can match
+            for key, child in children.items():
+                if distance - radius <= key <= distance + radius:
+                    stack.append(child)
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+def skip_similar(items: Iterable, key=lambda item: item["dhash"],
+                 max_bits: int = SIMILAR_BITS) -> Iterator:
+    """Yield items whose hash differs from the last yielded one by more than max_bits"""
+    last: Optional[int] = None
+    for item in items:
+        value_hash = key(item)
+        if value_hash is None or last is None or hamming(value_hash, last) > max_bits:
+            yield item
+            if value_hash is not None:
+                last = value_hash
+
+
+def near_duplicate_groups(hashes: Dict[str, int], max_bits: int = SIMILAR_BITS) -> List[List[str]]:
+    """Group names whose hashes are within max_bits of each other (single linkage)"""
+    tree = BKTree((h, name) for name, h in hashes.items())
+    seen = set()
+    groups = []
+    for name, value_hash in hashes.items():
+        if name in seen:
+            continue
+        group, frontier = [], [value_hash]
+        while frontier:
+            for _, other in tree.search(frontier.pop(), max_bits):
+                if other not in seen:
+                    seen.add(other)
+                    group.append(other)
+                    frontier.append(hashes[other])
+        groups.append(sorted(group))
+    return groups
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: perceptual_hash.py <photo.jpg> [<photo.jpg> ...]")
+        sys.exit(1)
+
+    hashes = {}
+    for path in sys.argv[1:]:
+        try:
+            hashes[path] = dhash(path)
+        except Exception as e:
+            print(f"⚠️ {path}: {e}")
+    for group in near_duplicate_groups(hashes):
+        print(f"{hashes[group[0]]:016x}  " + ", ".join(group))
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Content-addressed photo archive with a SQLite index.
+
+Every capture is stored once, under the SHA-256 of its bytes
+(objects/ab/abcdef....jpg, or .png etc. for other formats), however many names it arrives under
+(current_photo.jpg, latest_photo.jpg, ...); the names are kept as aliases.
+The index records capture time, size, dimensions, light state, session,
+cycle and thumbnail reference, so questions like "latest lit photo" or "all
+photos in cycle 3" are indexed queries instead of directory scans.
+
+A perceptual hash (dHash) is stored with each photo; similar() finds
+near-duplicates through a BK-tree.
+
+New photos get a 1/2, 1/4, 1/8 thumbnail pyramid (pyramid/), built by a
+background worker; level() hands analyses the smallest copy they can use.
+
+Usage:
+    python photo_archive.py import <dir|glob> [...]
+    python photo_archive.py latest [ON|OFF]
+    python photo_archive.py cycle <n>
+    python photo_archive.py pyramid          - build missing pyramids
+"""
+
+import os
+import sys
+import sqlite3
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+
+from thumbnail_pyramid import ThumbnailWorker, pick_level
+from perceptual_hash import BKTree, dhash, SIMILAR_BITS
+
+DEFAULT_ROOT = "photo_archive"
+# PIL format -> object file extension (anything else: the format name, lower-cased)
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "MPO": "jpg", "TIFF": "tif"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    sha256 TEXT PRIMARY KEY,
+    object_path TEXT NOT NULL,
+    captured_at TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    light_state TEXT,
+    light_confidence INTEGER,
+    session TEXT,
+    cycle INTEGER,
+    thumbnail TEXT,
+    dhash INTEGER
+);
+CREATE TABLE IF NOT EXISTS photo_names (
+    name TEXT NOT NULL,
+    sha256 TEXT NOT NULL REFERENCES photos(sha256),
+    PRIMARY KEY (name, sha256)
+);
+CREATE INDEX IF NOT EXISTS photos_by_time ON photos (captured_at);
+CREATE INDEX IF NOT EXISTS photos_by_light ON photos (light_state, captured_at);
+CREATE INDEX IF NOT EXISTS photos_by_cycle ON photos (cycle, captured_at);
+CREATE INDEX IF NOT EXISTS photos_by_session ON photos (session);
+"""
+
+# Columns added after the first schema, for existing index.db files
+MIGRATIONS = [
+    ("dhash", "ALTER TABLE photos ADD COLUMN dhash INTEGER"),
+]
+
+
+def _to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: Optional[int]) -> Optional[int]:
+    return value + (1 << 64) if value is not None and value < 0 else value
+
+
+def _iso(t: datetime) -> str:
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return t.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class PhotoArchive:
+    """Deduplicating photo store indexed in SQLite"""
+
+    def __init__(self, root: str = DEFAULT_ROOT, pyramids: bool = True):
+        """
+        Args:
+            root: Archive directory
+            pyramids: Build thumbnail pyramids for new photos in the background
+        """
+        self.root = root
+        self.pyramid_dir = os.path.join(root, "pyramid")
+        self.index_path = os.path.join(root, "index.db")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self.conn = sqlite3.connect(self.index_path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(photos)")}
+        for column, sql in MIGRATIONS:
+            if column not in columns:
+                self.conn.execute(sql)
+        self.pyramids = pyramids
+        self._bktree: Optional[BKTree] = None
+        self._thumbnails: Optional[ThumbnailWorker] = None
+
+    def close(self):
+        """Finish pending pyramids, then close the index"""
+        if self._thumbnails is not None:
+            self._thumbnails.join()
+            self._thumbnails.close()
+            self._thumbnails = None
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.commit()
+        self.close()
+
+    # --- Writing -----------------------------------------------------------
+
+    def add(self, source,
+            name: Optional[str] = None,
+            captured_at=None,
+            session: Optional[str] = None,
+            cycle: Optional[int] = None,
+            light_state: Optional[str] = None,
+            light_confidence: Optional[int] = None) -> str:
+        """
+        Store a photo (if its contents are new) and index it
+
+        Args:
+            source: File path or JPEG bytes
+            name: Name it arrived under (default: the file's basename)
+            captured_at: Capture time (default: the file's mtime, or now for bytes)
+            session: Light session id
+            cycle: Watering cycle number
+            light_state: Known light state; classified from the image if omitted
+            light_confidence: Confidence of light_state
+
+        Returns:
+            The photo's SHA-256
+
+        Raises:
+            ValueError: The bytes are not a readable image (nothing is stored)
+        """
+        if isinstance(source, bytes):
+            data = source
+            mtime = datetime.now(timezone.utc)
+        else:
+            with open(source, 'rb') as f:
+                data = f.read()
+            name = name or os.path.basename(source)
+            mtime = datetime.fromtimestamp(os.path.getmtime(source), timezone.utc)
+        sha = hashlib.sha256(data).hexdigest()
+
+        # Decode and classify before the write transaction, so the index isn't
+        # locked (against the pyramid worker's connection) while images decode
+        object_path = None
+        if not self.conn.execute("SELECT 1 FROM photos WHERE sha256 = ?", (sha,)).fetchone():
+            width, height, extension = self._image_info(data, name)
+            object_path = self._write_object(sha, data, extension)
+            if light_state is None:
+                from light_detector import detect_light_state
+                light_state, light_confidence, _, _ = detect_light_state(object_path)
+            try:
+                phash = _to_signed(dhash(object_path))
+            except Exception:
+                phash = None
+
+        with self.conn:
+            exists = self.conn.execute("SELECT 1 FROM photos WHERE sha256 = ?", (sha,)).fetchone()
+            if exists:
+                # Same capture again: keep the first record, fill in what it lacked
+                self.conn.execute(
+                    """UPDATE photos SET session = COALESCE(session, ?), cycle = COALESCE(cycle, ?),
+                                         light_state = COALESCE(light_state, ?),
+                                         light_confidence = COALESCE(light_confidence, ?)
+                       WHERE sha256 = ?""",
+                    (session, cycle, light_state, light_confidence, sha))
+                object_path = None  # another connection indexed it first; its pyramid is queued there
+            else:
+                self.conn.execute(
+                    "INSERT INTO photos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)",
+                    (sha, os.path.relpath(object_path, self.root), _iso(captured_at or mtime), len(data),
+                     width, height, light_state, light_confidence, session, cycle, phash))
+                if self._bktree is not None and phash is not None:
+                    self._bktree.add(_to_unsigned(phash), sha)
+            if name:
+                self.conn.execute("INSERT OR IGNORE INTO photo_names VALUES (?, ?)", (name, sha))
+        if object_path is not None and self.pyramids:
+            self._queue_pyramid(sha, object_path)
+        return sha
+
+    def import_paths(self, paths: List[str], **fields) -> Dict[str, int]:
+        """Add many files; returns counts of new, duplicate and rejected (non-image) files"""
+        before = self.count()
+        rejected = []
+        for path in paths:
+            try:
+                self.add(path, **fields)
+            except ValueError:
+                rejected.append(path)
+        added = self.count() - before
+        return {"files": len(paths), "new": added, "duplicates": len(paths) - added - len(rejected),
+                "rejected": rejected}
+
+    def set_thumbnail(self, sha: str, reference: str):
+        with self.conn:
+            self.conn.execute("UPDATE photos SET thumbnail = ? WHERE sha256 = ?", (reference, sha))
+
+    def build_missing_pyramids(self) -> int:
+        """Queue pyramids for photos that don't have one yet; returns how many"""
+        # Rows without dimensions were indexed before add() checked images; there is nothing to build
+        rows = self._rows("SELECT * FROM photos WHERE thumbnail IS NULL AND width IS NOT NULL")
+        for row in rows:
+            self._queue_pyramid(row["sha256"], row["path"])
+        return len(rows)
+
+    def wait_for_pyramids(self):
+        if self._thumbnails is not None:
+            self._thumbnails.join()
+
+    def _queue_pyramid(self, sha: str, path: str):
+        if self._thumbnails is None:
+            self._thumbnails = ThumbnailWorker(self.pyramid_dir, self.index_path)
+        self._thumbnails.submit(sha, path)
+
+    def _write_object(self, sha: str, data: bytes, extension: str = "jpg") -> str:
+        directory = os.path.join(self.root, "objects", sha[:2])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{sha}.{extension}")
+        if not os.path.exists(path):
+            fd, tmp = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def _image_info(data: bytes, name: Optional[str] = None):
+        """
+        (width, height, file extension) from the header
+
+        Raises:
+            ValueError: The bytes are not a well-formed image
+        """
+        from io import BytesIO
+        from PIL import Image
+        try:
+            with Image.open(BytesIO(data)) as img:
+                width, height = img.size
+                extension = FORMAT_EXTENSIONS.get(img.format, (img.format or "img").lower())
+                img.verify()  # structure check, no full decode
+        except Exception as e:
+            raise ValueError(f"Not an image: {name or 'bytes'} ({e})") from e
+        return width, height, extension
+
+    # --- Queries -----------------------------------------------------------
+
+    def _rows(self, sql: str, params=()) -> List[Dict]:
+        rows = [dict(row) for row in self.conn.execute(sql, params)]
+        for row in rows:
+            row["path"] = os.path.join(self.root, row["object_path"])
+            row["dhash"] = _to_unsigned(row.get("dhash"))
+        return rows
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM photos").fetchone()[0]
+
+    def get(self, sha: str) -> Optional[Dict]:
+        rows = self._rows("SELECT * FROM photos WHERE sha256 = ?", (sha,))
+        return rows[0] if rows else None
+
+    def latest(self, light_state: Optional[str] = None) -> Optional[Dict]:
+        """Most recent photo, optionally with the given light state ("ON" = latest lit photo)"""
+        if light_state is None:
+            rows = self._rows("SELECT * FROM photos ORDER BY captured_at DESC LIMIT 1")
+        else:
+            rows = self._rows("SELECT * FROM photos WHERE light_state = ? ORDER BY captured_at DESC LIMIT 1",
+                              (light_state,))
+        return rows[0] if rows else None
+
+    def level(self, photo: Dict, min_width: int) -> str:
+        """
+        Path of the smallest stored version at least `min_width` pixels wide
+
+        Falls back to the original when no pyramid level is big enough or the
+        pyramid hasn't been built yet.
+        """
+        if photo.get("width"):
+            path = pick_level(self.pyramid_dir, photo["sha256"], min_width, photo["width"])
+            if path is not None:
+                return path
+        return photo["path"]
+
+    def similar(self, photo: Dict, max_bits: int = SIMILAR_BITS) -> List[Dict]:
+        """Other photos within max_bits of this photo's perceptual hash, closest first"""
+        if photo.get("dhash") is None:
+            return []
+        if self._bktree is None:
+            self._bktree = BKTree((_to_unsigned(h), sha) for sha, h in self.conn.execute(
+                "SELECT sha256, dhash FROM photos WHERE dhash IS NOT NULL"))
+        matches = []
+        for distance, sha in self._bktree.search(photo["dhash"], max_bits):
+            if sha != photo["sha256"]:
+                matches.append(dict(self.get(sha), distance=distance))
+        return matches
+
+    def backfill_hashes(self) -> int:
+        """Compute perceptual hashes for photos indexed before they existed"""
+        rows = self._rows("SELECT * FROM photos WHERE dhash IS NULL")
+        with self.conn:
+            for row in rows:
+                try:
+                    self.conn.execute("UPDATE photos SET dhash = ? WHERE sha256 = ?",
+                                      (_to_signed(dhash(row["path"])), row["sha256"]))
+                except Exception:
+                    continue
+        self._bktree = None
+        return len(rows)
+
+    def all(self, light_state: Optional[str] = None) -> List[Dict]:
+        """Every photo (optionally only one light state), oldest first"""
+        if light_state is None:
+            return self._rows("SELECT * FROM photos ORDER BY captured_at")
+        return self._rows("SELECT * FROM photos WHERE light_state = ? ORDER BY captured_at", (light_state,))
+
+    def in_cycle(self, cycle: int) -> List[Dict]:
+        return self._rows("SELECT * FROM photos WHERE cycle = ? ORDER BY captured_at", (cycle,))
+
+    def in_session(self, session: str) -> List[Dict]:
+        return self._rows("SELECT * FROM photos WHERE session = ? ORDER BY captured_at", (session,))
+
+    def between(self, start, end, light_state: Optional[str] = None) -> List[Dict]:
+        start = start if isinstance(start, str) else _iso(start)
+        end = end if isinstance(end, str) else _iso(end)
+        if light_state is None:
+            return self._rows("SELECT * FROM photos WHERE captured_at BETWEEN ? AND ? ORDER BY captured_at",
+                              (start, end))
+        return self._rows("SELECT * FROM photos WHERE light_state = ? AND captured_at BETWEEN ? AND ? "
+                          "ORDER BY captured_at", (light_state, start, end))
+
+    def names(self, sha: str) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM photo_names WHERE sha256 = ? ORDER BY name", (sha,))]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "latest", "cycle", "pyramid"):
+        print("Usage: photo_archive.py import <dir|glob>... | latest [ON|OFF] | cycle <n> | pyramid")
+        sys.exit(1)
+
+    with PhotoArchive() as archive:
+        if sys.argv[1] == "import":
+            from light_detector import expand_photos
+            counts = archive.import_paths(expand_photos(sys.argv[2:] or ["."]))
+            print(f"✓ Imported {counts['files']} files: {counts['new']} new, {counts['duplicates']} duplicates")
+            for path in counts["rejected"]:
+                print(f"⚠️ Skipped {path}: not an image")
+        elif sys.argv[1] == "pyramid":
+            queued = archive.build_missing_pyramids()
+            archive.backfill_hashes()
+            archive.wait_for_pyramids()
+            print(f"✓ Built {queued} pyramid(s)")
+        elif sys.argv[1] == "latest":
+            photo = archive.latest(sys.argv[2].upper() if len(sys.argv) > 2 else None)
+            if photo is None:
+                print("No matching photo")
+            else:
+                print(f"{photo['captured_at']}  {photo['light_state']}  {photo['path']}")
+                print(f"Also known as: {', '.join(archive.names(photo['sha256']))}")
+        else:
+            for photo in archive.in_cycle(int(sys.argv[2])):
+                print(f"{photo['captured_at']}  {photo['light_state']:<7}  {photo['path']}")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Background photo verification for light sessions.
+
+Verification used to be inline: sleep 5 s, capture, download, classify, print.
+Here a capture request is just put on a queue and the caller moves on; a small
+pool of worker threads captures (or downloads) the photo, classifies the light
+state and attaches the verdict to the session's record, then hands it to an
+optional callback. Scheduling latency no longer depends on the camera or the
+network. Only the most recent RECORDS_KEPT sessions' verdicts are kept, so a
+long-running daemon doesn't grow without bound.
+
+Usage:
+    python photo_verification.py [ON|OFF] <photo_url_or_path> ...
+"""
+
+import sys
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_WORKERS = 2
+RECORDS_KEPT = 200
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class PhotoVerifier:
+    """Queue of verification requests served by a worker pool"""
+
+    def __init__(self,
+                 capture: Optional[Callable[[], Dict]] = None,
+                 classify: Optional[Callable] = None,
+                 workers: int = DEFAULT_WORKERS,
+                 on_verdict: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            capture: Takes a photo and returns a dict with its "url"
+                     (needed only for requests submitted without a photo)
+            classify: photo url/path -> (state, confidence, size, reasoning)
+                      (default: light_detector.detect_light_state)
+            workers: Number of worker threads
+            on_verdict: Called (from a worker thread) with each verdict; an
+                        exception it raises is kept in `errors`, the worker
+                        carries on
+        """
+        if classify is None:
+            from light_detector import detect_light_state
+            classify = detect_light_state
+        self.capture = capture
+        self.classify = classify
+        self.on_verdict = on_verdict
+
+        self.records: "OrderedDict[str, Dict]" = OrderedDict()
+        self.errors: List[str] = []
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads = [threading.Thread(target=self._work, daemon=True, name=f"photo-verify-{i}")
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session: str, expect: Optional[str] = None, photo: Optional[str] = None):
+        """
+        Queue a verification and return immediately
+
+        Args:
+            session: Session id the verdict is attached to
+            expect: Expected light state ("ON" / "OFF"), if any
+            photo: Photo URL or path; captured by a worker when omitted
+        """
+        with self._lock:
+            if session in self.records:
+                self.records.move_to_end(session)
+            else:
+                self.records[session] = {"session": session, "verifications": []}
+                while len(self.records) > RECORDS_KEPT:
+                    self.records.popitem(last=False)
+        self._queue.put((session, expect, photo, _now_iso()))
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def join(self):
+        """Block until every queued verification has finished"""
+        self._queue.join()
+
+    def close(self, wait: bool = True, cancel_pending: bool = False):
+        """
+        Stop the workers
+
+        Args:
+            wait: Block until the workers have exited (no callback runs after this)
+            cancel_pending: Drop queued requests that haven't started yet
+        """
+        if cancel_pending:
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._queue.task_done()
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def verdicts(self, session: str) -> List[Dict]:
+        with self._lock:
+            return list(self.records.get(session, {}).get("verifications", []))
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                verdict = self._verify(*item)
+                with self._lock:
+                    record = self.records.get(verdict["session"])
+                    if record is not None:
+                        record["verifications"].append(verdict)
+                if self.on_verdict is not None:
+                    try:
+                        self.on_verdict(verdict)
+                    except Exception as e:
+                        self.errors.append(f"{verdict['session']}: on_verdict failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _verify(self, session: str, expect: Optional[str], photo: Optional[str], requested_at: str) -> Dict:
+        verdict = {"session": session, "expect": expect, "requested_at": requested_at, "photo": photo}
+        try:
+            if photo is None:
+                photo = verdict["photo"] = self.capture()["url"]
+            state, confidence, size, reasoning = self.classify(photo)
+            verdict.update(state=state, confidence=confidence, size=size, reasoning=reasoning,
+                           ok=None if expect is None else state == expect)
+        except Exception as e:
+            verdict.update(state=None, ok=False, error=str(e))
+        verdict["verified_at"] = _now_iso()
+        return verdict
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    expect = args.pop(0).upper() if args and args[0].upper() in ("ON", "OFF") else None
+    if not args:
+        print("Usage: photo_verification.py [ON|OFF] <photo_url_or_path> ...")
+        sys.exit(1)
+
+    verifier = PhotoVerifier()
+    for photo in args:
+        verifier.submit(photo, expect, photo)
+    verifier.join()
+    verifier.close()
+
+    for photo in args:
+        for v in verifier.verdicts(photo):
+            mark = "✓" if v["ok"] else ("⚠️" if v["ok"] is False else "•")
+            print(f"{mark} {photo}: {v['state']}"
+                  f"{' (expected ' + expect + ')' if expect else ''}"
+                  f"{' - ' + v['error'] if v.get('error') else ''}")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Cooldown-aware photoperiod planner.
+
+The light has a hard cooldown after every session and a cap on session
+length, so a day's target is delivered fastest by the fewest sessions run
+back to back: k = ceil(remaining / max_session) sessions, the last one
+shortened (and earlier ones trimmed if needed so none is below the minimum).
+Finish time is then start + remaining + (k - 1) * cooldown, with no search.
+
+When a deadline cuts the day short the plan delivers as many minutes as fit
+and reports the shortfall; plan_days() chains per-day plans, carrying the
+cooldown across midnight. Everything is plain arithmetic, so the scheduler can
+re-plan after every event.
+
+Usage:
+    python photoperiod_planner.py <remaining-minutes> [start-iso] [deadline-iso]
+"""
+
+import sys
+from datetime import datetime, time, timedelta, timezone
+from typing import List, Dict, Optional
+
+COOLDOWN_MINUTES = 30
+MIN_SESSION_MINUTES = 30
+MAX_SESSION_MINUTES = 120
+
+
+def pack_sessions(remaining: int,
+                  min_session: int = MIN_SESSION_MINUTES,
+                  max_session: int = MAX_SESSION_MINUTES) -> List[int]:
+    """
+    Split remaining minutes into the fewest sessions within [min, max]
+
+    Full-length sessions first; if the tail would be under the minimum it is
+    topped up from the sessions before it. A remainder below the minimum on
+    its own becomes one minimum-length session.
+    """
+    if remaining <= 0:
+        return []
+    if remaining <= max_session:
+        return [max(remaining, min_session)]
+    count = -(-remaining // max_session)
+    sessions = [max_session] * (count - 1) + [remaining - max_session * (count - 1)]
+    i = count - 2
+    while sessions[-1] < min_session and i >= 0:
+        moved = min(min_session - sessions[-1], sessions[i] - min_session)
+        sessions[i] -= moved
+        sessions[-1] += moved
+        i -= 1
+    return sessions
+
+
+def next_available(now: datetime, off_at: Optional[datetime] = None,
+                   cooldown_minutes: float = COOLDOWN_MINUTES) -> datetime:
+    """Earliest time the light can be switched on again"""
+    if off_at is None:
+        return now
+    return max(now, off_at + timedelta(minutes=cooldown_minutes))
+
+
+def plan_sessions(remaining: int,
+                  now: datetime,
+                  off_at: Optional[datetime] = None,
+                  deadline: Optional[datetime] = None,
+                  cooldown_minutes: float = COOLDOWN_MINUTES,
+                  min_session: int = MIN_SESSION_MINUTES,
+                  max_session: int = MAX_SESSION_MINUTES) -> Dict:
+    """
+    Earliest-finishing session sequence for one day
+
+    Args:
+        remaining: Minutes still needed (excluding any session in progress)
+        now: Current time
+        off_at: When the current/last session ends (None if never lit / long off);
+                minutes it still delivers after `now` count toward `remaining`
+        deadline: Latest time any session may end
+        cooldown_minutes, min_session, max_session: Light constraints
+
+    Returns:
+        dict with sessions [(start, minutes)], finish, planned_minutes,
+        shortfall_minutes and feasible
+    """
+    if off_at is not None and off_at > now:
+        remaining -= int((off_at - now).total_seconds() // 60)
+    start = next_available(now, off_at, cooldown_minutes)
+    lengths = pack_sessions(remaining, min_session, max_session)
+
+    sessions = []
+    cursor = start
+    cooldown = timedelta(minutes=cooldown_minutes)
+    for minutes in lengths:
+        sessions.append((cursor, minutes))
+        cursor += timedelta(minutes=minutes) + cooldown
+
+    if deadline is not None and sessions and sessions[-1][0] + timedelta(minutes=sessions[-1][1]) > deadline:
+        # Doesn't fit: every cooldown costs the same, so long sessions back to
+        # back (the last trimmed to the deadline) deliver the most minutes
+        sessions = []
+        cursor = start
+        left = remaining
+        while left > 0:
+            minutes = min(left, max_session, int((deadline - cursor).total_seconds() // 60))
+            if minutes < min_session:
+                break
+            sessions.append((cursor, minutes))
+            left -= minutes
+            cursor += timedelta(minutes=minutes) + cooldown
+
+    planned = sum(minutes for _, minutes in sessions)
+    finish = sessions[-1][0] + timedelta(minutes=sessions[-1][1]) if sessions else max(start, now)
+    shortfall = max(remaining - planned, 0)
+    return {
+        "sessions": sessions,
+        "finish": finish,
+        "planned_minutes": planned,
+        "shortfall_minutes": shortfall,
+        "feasible": shortfall == 0,
+    }
+
+
+def plan_days(daily_target: int,
+              now: datetime,
+              days: int = 1,
+              delivered_today: int = 0,
+              off_at: Optional[datetime] = None,
+              day_start: time = time(0, 0),
+              day_end: Optional[time] = None,
+              cooldown_minutes: float = COOLDOWN_MINUTES,
+              min_session: int = MIN_SESSION_MINUTES,
+              max_session: int = MAX_SESSION_MINUTES) -> List[Dict]:
+    """
+    Plan `days` consecutive UTC days, carrying the cooldown across midnight
+
+    Args:
+        daily_target: Light minutes per day
+        now: Current time
+        days: Number of days to plan, starting today
+        delivered_today: Minutes already delivered today
+        off_at: End of the current/last session
+        day_start: Earliest session start each day (UTC)
+        day_end: Latest session end each day (UTC, default: midnight)
+
+    Returns:
+        One plan_sessions() result per day, with its "date" added
+    """
+    plans = []
+    today = now.astimezone(timezone.utc).date()
+    for offset in range(days):
+        day = today + timedelta(days=offset)
+        opens = datetime.combine(day, day_start, tzinfo=timezone.utc)
+        closes = (datetime.combine(day, day_end, tzinfo=timezone.utc) if day_end
+                  else datetime.combine(day + timedelta(days=1), time(0, 0), tzinfo=timezone.utc))
+        remaining = daily_target - (delivered_today if offset == 0 else 0)
+        plan = plan_sessions(remaining, max(now, opens), off_at, closes,
+                             cooldown_minutes, min_session, max_session)
+        plan["date"] = day.isoformat()
+        plans.append(plan)
+        if plan["sessions"]:
+            off_at = plan["finish"]
+    return plans
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: photoperiod_planner.py <remaining-minutes> [start-iso] [deadline-iso]")
+        sys.exit(1)
+
+    remaining = int(sys.argv[1])
+    start = (datetime.fromisoformat(sys.argv[2].replace('Z', '+00:00')) if len(sys.argv) > 2
+             else datetime.now(timezone.utc))
+    deadline = datetime.fromisoformat(sys.argv[3].replace('Z', '+00:00')) if len(sys.argv) > 3 else None
+
+    plan = plan_sessions(remaining, start, deadline=deadline)
+    for i, (at, minutes) in enumerate(plan["sessions"], 1):
+        print(f"Session {i}: {at.strftime('%Y-%m-%d %H:%M')} UTC - {minutes} min")
+    print(f"Finish: {plan['finish'].strftime('%Y-%m-%d %H:%M')} UTC "
+          f"({plan['planned_minutes']} min planned, shortfall {plan['shortfall_minutes']} min)")
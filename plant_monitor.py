@@ -8,24 +8,34 @@ from datetime import datetime, timedelta
 from typing import List, Tuple, Dict, Optional
 import json
 
+from sensor_calibration import CalibrationProfile, DEFAULT_PROFILE, SENSOR_WET, SENSOR_DRY
+from photoperiod_planner import pack_sessions, plan_sessions, COOLDOWN_MINUTES
+from profiling import profiled
+
 class MoistureTrendAnalyzer:
     """Analyze moisture sensor trends and predict watering needs"""
     
-    def __init__(self, wet_reference=1100, dry_reference=3400):
+    def __init__(self, wet_reference=SENSOR_WET, dry_reference=SENSOR_DRY,
+                 profile: Optional[CalibrationProfile] = None):
         self.wet_ref = wet_reference
         self.dry_ref = dry_reference
+        if profile is None:
+            if (wet_reference, dry_reference) == (SENSOR_WET, SENSOR_DRY):
+                profile = DEFAULT_PROFILE
+            else:
+                profile = CalibrationProfile.linear("custom", wet_reference, dry_reference)
+        self.profile = profile
         self.watering_threshold = 2200
         
     def to_percentage(self, value: int) -> float:
         """Convert raw sensor to moisture percentage (100% = wet, 0% = dry)"""
-        if value <= self.wet_ref:
-            return 100.0
-        if value >= self.dry_ref:
-            return 0.0
-        # Invert: higher sensor value = drier soil
-        pct = 100 * (1 - (value - self.wet_ref) / (self.dry_ref - self.wet_ref))
-        return round(pct, 1)
+        return round(self.profile.to_percentage(value), 1)
+
+    def to_percentages(self, values):
+        """Convert an array of raw readings to moisture percentages (numpy array)"""
+        return self.profile.convert(values).round(1)
     
+    @profiled("trend.analyze_trend")
     def analyze_trend(self, readings: List[Tuple[str, int]]) -> Dict:
         """
         Analyze moisture trend from time-series readings
@@ -154,13 +164,22 @@ class MoistureTrendAnalyzer:
 class LightScheduler:
     """Calculate optimal lighting schedules"""
     
-    def __init__(self, daily_target_hours=7):
+    def __init__(self, daily_target_hours=7, cooldown_minutes=COOLDOWN_MINUTES):
         self.daily_target = daily_target_hours
         self.session_min = 30
         self.session_max = 120
+        self.cooldown = cooldown_minutes
         
-    def calculate_remaining_light(self, current_minutes: int) -> Dict:
-        """Calculate how much more light is needed today"""
+    def calculate_remaining_light(self, current_minutes: int,
+                                  now: Optional[datetime] = None,
+                                  off_at: Optional[datetime] = None,
+                                  deadline: Optional[datetime] = None) -> Dict:
+        """
+        Calculate how much more light is needed today
+
+        Pass `now` (and the light's `off_at` / a `deadline` if known) to also
+        get a timed, cooldown-aware schedule from the photoperiod planner.
+        """
         target_minutes = self.daily_target * 60
         remaining = target_minutes - current_minutes
         
@@ -172,22 +191,27 @@ class LightScheduler:
                 "suggestion": "Daily target achieved"
             }
         
-        # Suggest session schedule
-        if remaining <= self.session_max:
-            sessions = [remaining]
+        # Fewest sessions within the session limits
+        sessions = pack_sessions(remaining, self.session_min, self.session_max)
+        if len(set(sessions)) == 1:
+            suggestion = f"Provide {len(sessions)} session(s) of {sessions[0]}min each"
         else:
-            # Split into multiple sessions
-            num_sessions = (remaining + self.session_max - 1) // self.session_max
-            session_length = remaining // num_sessions
-            sessions = [session_length] * num_sessions
+            suggestion = f"Provide {len(sessions)} sessions: {' + '.join(f'{m}min' for m in sessions)}"
         
-        return {
+        result = {
             "status": "needs_more_light",
             "remaining_minutes": remaining,
             "sessions_needed": len(sessions),
             "suggested_sessions": sessions,
-            "suggestion": f"Provide {len(sessions)} session(s) of {sessions[0]}min each"
+            "suggestion": suggestion
         }
+        if now is not None:
+            plan = plan_sessions(remaining, now, off_at, deadline, self.cooldown,
+                                 self.session_min, self.session_max)
+            result["schedule"] = plan["sessions"]
+            result["finish"] = plan["finish"]
+            result["shortfall_minutes"] = plan["shortfall_minutes"]
+        return result
 
 
 class PlantHealthScorer:
@@ -227,21 +251,24 @@ class PlantHealthScorer:
         else:
             factors.append("⚠️ Visual concerns")
         
-        if score >= 90:
-            status = "excellent"
-        elif score >= 70:
-            status = "good"
-        elif score >= 50:
-            status = "fair"
-        else:
-            status = "concerning"
-        
         return {
             "score": score,
-            "status": status,
+            "status": self.status_for(score),
             "factors": factors
         }
 
+    @staticmethod
+    def status_for(score: float) -> str:
+        """Map a 0-100 score to its status band"""
+        if score >= 90:
+            return "excellent"
+        elif score >= 70:
+            return "good"
+        elif score >= 50:
+            return "fair"
+        else:
+            return "concerning"
+
 
 def demo_analysis():
     """Demonstrate analysis capabilities"""
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Event-driven plant scheduler daemon.
+
+Replaces the per-day day21_* / run_light_sessions.py scripts, which hard-code
+dates and block in time.sleep() for hours. One asyncio loop owns a heap of
+absolute deadlines on the monotonic clock and sleeps until the earliest one
+(or until a new job is scheduled), so it idles at ~0% CPU and never drifts:
+recurring jobs are re-armed from their previous deadline, not from "now".
+
+- light sessions, verification photos and moisture reads all run as tasks on
+  the same loop, so monitoring keeps going while the light is on
+- verification photos are queued to a PhotoVerifier worker pool and their
+  verdicts attached to the session record when they arrive
+- blocking HTTP calls run in worker threads (asyncio.to_thread)
+- the pending plan is persisted to JSON (wall-clock UTC times) after every
+  change and reloaded on start, so a crash or reboot loses nothing
+
+Usage:
+    python plant_scheduler.py run [plan.json]
+    python plant_scheduler.py add <start-iso|now> <minutes> [<minutes> ...] [plan.json]
+    python plant_scheduler.py plan <remaining-minutes> [deadline-iso] [plan.json]
+    python plant_scheduler.py show [plan.json]
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import asyncio
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional
+
+from light_state import LightStateTracker
+from profiling import span
+
+DEFAULT_API = os.environ.get("PLANT_API_URL", "http://plant-server.cynexia.net:8000/api")
+DEFAULT_PLAN = "scheduler_plan.json"
+COOLDOWN_MINUTES = 30
+VERIFY_DELAY_SECONDS = 5
+SESSIONS_KEPT = 50
+MOISTURE_INTERVAL_MINUTES = 15
+
+
+def log(msg: str):
+    """Log with timestamp"""
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    print(f"[{now}] {msg}", flush=True)
+
+
+def _parse(timestamp) -> datetime:
+    if isinstance(timestamp, datetime):
+        return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _iso(t: datetime) -> str:
+    return t.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class PlantAPI:
+    """Blocking client for the plant server's light / camera / moisture endpoints"""
+
+    def __init__(self, base_url: str = DEFAULT_API, timeout: float = 10):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _call(self, method: str, path: str, **kwargs) -> Dict:
+        with span(f"api.{method} {path}"):
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+            response.raise_for_status()
+            return response.json()
+
+    def turn_on_light(self, minutes: int) -> Dict:
+        return self._call("POST", "/light/on", json={"minutes": minutes})
+
+    def light_status(self) -> Dict:
+        return self._call("GET", "/light/status")
+
+    def capture_photo(self) -> Dict:
+        return self._call("GET", "/camera/capture")
+
+    def read_moisture(self) -> Dict:
+        return self._call("GET", "/moisture")
+
+
+class PlantScheduler:
+    """Single-loop scheduler for light sessions, verification photos and moisture reads"""
+
+    def __init__(self,
+                 api: Optional[PlantAPI] = None,
+                 plan_path: str = DEFAULT_PLAN,
+                 store=None,
+                 moisture_interval_minutes: Optional[float] = MOISTURE_INTERVAL_MINUTES,
+                 verify_photos: bool = True):
+        """
+        Args:
+            api: Plant server client (default: PlantAPI())
+            plan_path: JSON file the pending plan is persisted to
+            store: Optional DailyStateStore fed with every reading / session / photo
+            moisture_interval_minutes: Moisture read period (None to disable)
+            verify_photos: Take ON/OFF verification photos around each session
+        """
+        self.api = api or PlantAPI()
+        self.plan_path = plan_path
+        self.store = store
+        self.moisture_interval = moisture_interval_minutes * 60 if moisture_interval_minutes else None
+        self.verify_photos = verify_photos
+        self.light = LightStateTracker(COOLDOWN_MINUTES)
+
+        self.jobs: Dict[int, Dict] = {}
+        self.sessions: Dict[str, Dict] = {}
+        self._verifier = None
+        self._heap: List = []
+        self._ids = itertools.count(1)
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks = set()
+        self._stopping = False
+        self._load()
+
+    # --- Plan ------------------------------------------------------------
+
+    def schedule(self, kind: str, at, persist: bool = True, **params) -> Dict:
+        """
+        Add a one-shot job
+
+        Args:
+            kind: "light", "photo" or "moisture"
+            at: Wall-clock time (ISO string or datetime) to run at
+            **params: Job parameters (e.g. minutes=120, expect="ON")
+
+        Returns:
+            The job record
+        """
+        at = _parse(at)
+        if at.microsecond:
+            # The plan stores whole seconds; round up so a job never fires early
+            at = at.replace(microsecond=0) + timedelta(seconds=1)
+        job = {"id": next(self._ids), "kind": kind, "at": _iso(at), "params": params}
+        self.jobs[job["id"]] = job
+        self._push(job)
+        if persist:
+            self._save()
+        return job
+
+    def schedule_sessions(self, start, minutes: List[int], cooldown_minutes: float = COOLDOWN_MINUTES) -> List[Dict]:
+        """Schedule back-to-back light sessions separated by the cooldown"""
+        at = _parse(start)
+        jobs = []
+        for duration in minutes:
+            jobs.append(self.schedule("light", at, persist=False, minutes=duration))
+            at += timedelta(minutes=duration + cooldown_minutes)
+        self._save()
+        return jobs
+
+    def plan_light(self, remaining_minutes: int, off_at=None, deadline=None) -> Dict:
+        """
+        Replace pending light sessions with the planner's earliest-finishing plan
+
+        Args:
+            remaining_minutes: Light minutes still needed
+            off_at: End of the current/last session (default: tracked light state)
+            deadline: Latest time a session may end
+
+        Returns:
+            The photoperiod_planner.plan_sessions() result
+        """
+        from photoperiod_planner import plan_sessions
+        for job in [job for job in self.jobs.values() if job["kind"] == "light"]:
+            del self.jobs[job["id"]]
+        plan = plan_sessions(remaining_minutes, datetime.now(timezone.utc),
+                             _parse(off_at) if off_at else self.light.off_at,
+                             _parse(deadline) if deadline else None)
+        for at, minutes in plan["sessions"]:
+            self.schedule("light", at, persist=False, minutes=minutes)
+        self._save()
+        return plan
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a pending job (its heap entry is skipped lazily)"""
+        if self.jobs.pop(job_id, None) is None:
+            return False
+        self._save()
+        return True
+
+    def pending(self) -> List[Dict]:
+        return sorted(self.jobs.values(), key=lambda job: (job["at"], job["id"]))
+
+    def _push(self, job: Dict, deadline: Optional[float] = None):
+        if deadline is None:
+            # Map the wall-clock time onto the monotonic clock once, here
+            delay = (_parse(job["at"]) - datetime.now(timezone.utc)).total_seconds()
+            deadline = time.monotonic() + delay
+        heapq.heappush(self._heap, (deadline, job["id"]))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _load(self):
+        try:
+            with open(self.plan_path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.sessions = {session["on_at"]: session for session in saved.get("sessions", [])}
+        for job in saved.get("jobs", []):
+            self.jobs[job["id"]] = job
+            self._push(job)
+        self._ids = itertools.count(max(self.jobs, default=0) + 1)
+        if self.jobs:
+            log(f"Resumed {len(self.jobs)} pending job(s) from {self.plan_path}")
+
+    def _save(self):
+        tmp = f"{self.plan_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"saved_at": _iso(datetime.now(timezone.utc)), "jobs": self.pending(),
+                       "sessions": [self.sessions[k] for k in sorted(self.sessions)[-SESSIONS_KEPT:]]},
+                      f, indent=2)
+        os.replace(tmp, self.plan_path)
+
+    # --- Loop ------------------------------------------------------------
+
+    async def run(self):
+        """Run until stop() is called"""
+        self._wake = asyncio.Event()
+        if self.verify_photos:
+            from photo_verification import PhotoVerifier
+            loop = asyncio.get_running_loop()
+            self._verifier = PhotoVerifier(
+                capture=self.api.capture_photo,
+                on_verdict=lambda verdict: loop.call_soon_threadsafe(self._on_verdict, verdict))
+        await self._reconcile_light()
+        if self.moisture_interval:
+            self._arm_moisture(time.monotonic())
+
+        while not self._stopping:
+            if not self._heap:
+                await self._wake.wait()
+                self._wake.clear()
+                continue
+            deadline, job_id = self._heap[0]
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            heapq.heappop(self._heap)
+            if job_id < 0:
+                # Recurring moisture read: re-arm from this deadline, not from now
+                self._arm_moisture(deadline + self.moisture_interval)
+                self._spawn(self._dispatch({"id": job_id, "kind": "moisture", "params": {}}))
+                continue
+            job = self.jobs.pop(job_id, None)
+            if job is None:
+                continue  # cancelled
+            self._save()
+            self._spawn(self._dispatch(job))
+
+        for task in list(self._tasks):
+            task.cancel()
+        if self._verifier is not None:
+            # Let in-flight verifications finish while the loop can still take their verdicts
+            await asyncio.to_thread(self._verifier.close, True, True)
+            self._verifier = None
+
+    def stop(self):
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
+
+    def _arm_moisture(self, deadline: float):
+        heapq.heappush(self._heap, (deadline, -1))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, job: Dict):
+        handler = {"light": self._start_light, "photo": self._take_photo,
+                   "moisture": self._read_moisture}.get(job["kind"])
+        if handler is None:
+            log(f"Unknown job kind {job['kind']!r} (job {job['id']}), dropped")
+            return
+        try:
+            await handler(job.get("at"), **job["params"])
+        except Exception as e:
+            log(f"❌ {job['kind']} job {job['id']} failed: {e}")
+
+    # --- Handlers --------------------------------------------------------
+
+    async def _reconcile_light(self):
+        """One status read at start-up; afterwards the tracker is fed by command responses"""
+        try:
+            status = await asyncio.to_thread(self.api.light_status)
+        except Exception as e:
+            log(f"Light status unavailable ({e}), assuming OFF")
+            return
+        self.light.reconcile(status)
+
+    async def _start_light(self, at: Optional[str], minutes: int):
+        now = datetime.now(timezone.utc)
+        if not self.light.can_activate(now):
+            # Still on or cooling down: move the session to the exact moment it's allowed
+            job = self.schedule("light", self.light.available_at(now), minutes=minutes)
+            log(f"Light {self.light.state(now)}, session moved to {job['at']}")
+            return
+        if at is not None:
+            # A session missed while the daemon was down still runs for what's left of it
+            late = (now - _parse(at)).total_seconds() / 60
+            if late >= minutes:
+                log(f"Light session at {at} ({minutes} min) missed entirely, skipped")
+                return
+            if late >= 1:
+                minutes = int(minutes - late)
+
+        result = await asyncio.to_thread(self.api.turn_on_light, minutes)
+        off_at = _parse(result["off_at"]) if result.get("off_at") else now + timedelta(minutes=minutes)
+        self.light.light_on({"off_at": off_at}, now)
+        session = _iso(now)
+        self.sessions[session] = {"on_at": session, "off_at": _iso(off_at), "minutes": minutes,
+                                  "verifications": []}
+        log(f"💡 Light ON for {minutes} min, auto-off at {_iso(off_at)}")
+        if self.store is not None:
+            self.store.ingest_light(now, off_at)
+            self.store.commit()
+        if self.verify_photos:
+            self.schedule("photo", now + timedelta(seconds=VERIFY_DELAY_SECONDS), persist=False,
+                          expect="ON", session=session)
+            self.schedule("photo", off_at + timedelta(seconds=VERIFY_DELAY_SECONDS), persist=False,
+                          expect="OFF", session=session)
+        self._save()
+
+    async def _take_photo(self, at: Optional[str] = None, expect: Optional[str] = None,
+                          session: Optional[str] = None):
+        """Queue the capture + classification; the verdict arrives via _on_verdict"""
+        if self._verifier is None:
+            result = await asyncio.to_thread(self.api.capture_photo)
+            self._on_verdict({"session": session, "photo": result.get("url"), "expect": None, "ok": None})
+            return
+        self._verifier.submit(session or at, expect)
+
+    def _on_verdict(self, verdict: Dict):
+        """Attach a verification verdict to its session (runs on the loop thread)"""
+        if verdict.get("error"):
+            log(f"❌ Photo verification failed: {verdict['error']}")
+            mark = None
+        else:
+            log(f"📷 Photo captured: {verdict['photo']}")
+            if self.store is not None:
+                self.store.ingest_photo(datetime.now(timezone.utc))
+                self.store.commit()
+            mark = "✓" if verdict["ok"] else "⚠️"
+        if verdict.get("expect") and mark:
+            log(f"{mark} Expected light {verdict['expect']}, photo says {verdict['state']} "
+                f"({verdict['confidence']}%): {verdict['reasoning']}")
+        record = self.sessions.get(verdict["session"])
+        if record is not None:
+            record["verifications"].append(verdict)
+            self._save()
+
+    async def _read_moisture(self, at: Optional[str] = None):
+        result = await asyncio.to_thread(self.api.read_moisture)
+        value = result.get("value", result.get("moisture"))
+        timestamp = result.get("timestamp") or _iso(datetime.now(timezone.utc))
+        if self.store is not None and value is not None:
+            self.store.ingest_moisture(timestamp, value)
+            self.store.commit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("run", "add", "plan", "show"):
+        print("Usage: plant_scheduler.py run [plan.json] | add <start-iso|now> <minutes>... [plan.json] | "
+              "plan <remaining-minutes> [deadline-iso] [plan.json] | show [plan.json]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    args = sys.argv[2:]
+    plan_path = DEFAULT_PLAN
+    if command in ("add", "plan") and args and args[-1].endswith(".json"):
+        plan_path = args.pop()
+    if command == "add":
+        start = datetime.now(timezone.utc) if args[0] == "now" else args[0]
+        scheduler = PlantScheduler(plan_path=plan_path, moisture_interval_minutes=None)
+        for job in scheduler.schedule_sessions(start, [int(m) for m in args[1:]]):
+            print(f"✓ Scheduled light {job['params']['minutes']} min at {job['at']}")
+    elif command == "plan":
+        scheduler = PlantScheduler(plan_path=plan_path, moisture_interval_minutes=None)
+        plan = scheduler.plan_light(int(args[0]), deadline=args[1] if len(args) > 1 else None)
+        for at, minutes in plan["sessions"]:
+            print(f"✓ Scheduled light {minutes} min at {_iso(at)}")
+        if plan["shortfall_minutes"]:
+            print(f"⚠️ {plan['shortfall_minutes']} min won't fit before the deadline")
+    elif command == "show":
+        plan = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PLAN
+        for job in PlantScheduler(plan_path=plan, moisture_interval_minutes=None).pending():
+            print(f"{job['at']}  #{job['id']:<4} {job['kind']:<8} {json.dumps(job['params'])}")
+    else:
+        from daily_state import DailyStateStore
+        plan = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PLAN
+        with DailyStateStore() as store:
+            scheduler = PlantScheduler(plan_path=plan, store=store)
+            log(f"Scheduler started with {len(scheduler.jobs)} pending job(s)")
+            try:
+                asyncio.run(scheduler.run())
+            except KeyboardInterrupt:
+                log("Scheduler stopped")
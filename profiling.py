@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling hooks for the analysis hot paths.
+
+Hot functions are decorated with @profiled and hot blocks wrapped in
+`with span(name):`. Profiling is switched on by the GARDENER_PROFILE
+environment variable (or `gardener.py --profile PATH`), whose value is the
+output file:
+
+- *.folded / *.collapsed: collapsed stacks ("outer;inner <self-us>"), one
+  line per distinct stack, for flamegraph.pl / speedscope / inferno
+- anything else: JSONL, one record per finished span with its stack, wall
+  and CPU time (ms, CPU is the calling thread's) and net allocated memory
+  blocks (sys.getallocatedblocks delta)
+
+When profiling is off, @profiled returns the function itself and span()
+returns one shared nullcontext, so instrumented code runs exactly as before.
+The decision is made when a decorated module is imported: enable() has to
+run before the instrumented modules are loaded (gardener imports them
+inside its subcommands, after parsing --profile).
+
+Usage:
+    GARDENER_PROFILE=trace.jsonl python gardener.py analyze readings.json
+    python profiling.py trace.jsonl [--folded out.folded]   - summarize / convert a trace
+"""
+
+import os
+import sys
+import time
+import json
+import atexit
+import functools
+import threading
+import contextlib
+from typing import Callable, Dict
+
+ENV_VAR = "GARDENER_PROFILE"
+FOLDED_SUFFIXES = ('.folded', '.collapsed')
+
+enabled = False
+_recorder = None
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Recorder:
+    """Collects finished spans and writes them out"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.folded = path.endswith(FOLDED_SUFFIXES)
+        self.stacks: Dict[str, int] = {}  # collapsed stack -> self time (us)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = None if self.folded else open(path, 'a', buffering=1)
+        atexit.register(self.close)
+
+    def stack(self):
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def record(self, stack: str, wall_ns: int, self_ns: int, cpu_ns: int, blocks: int, started: float):
+        with self._lock:
+            if self.folded:
+                self.stacks[stack] = self.stacks.get(stack, 0) + self_ns // 1000
+            else:
+                self._file.write(json.dumps({
+                    "name": stack.rsplit(';', 1)[-1], "stack": stack,
+                    "thread": threading.current_thread().name, "start": round(started, 6),
+                    "wall_ms": round(wall_ns / 1e6, 3), "self_ms": round(self_ns / 1e6, 3),
+                    "cpu_ms": round(cpu_ns / 1e6, 3), "alloc_blocks": blocks,
+                }) + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            elif self.folded and self.stacks:
+                write_folded(self.stacks, self.path)
+                self.stacks = {}
+
+
+class _Span:
+    __slots__ = ("name", "frames", "wall", "cpu", "blocks", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.frames = _recorder.stack()
+        # [name, wall ns spent in child spans]
+        self.frames.append([self.name, 0])
+        self.started = time.time()
+        self.blocks = sys.getallocatedblocks()
+        self.cpu = time.thread_time_ns()
+        self.wall = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter_ns() - self.wall
+        cpu = time.thread_time_ns() - self.cpu
+        blocks = sys.getallocatedblocks() - self.blocks
+        stack = ";".join(frame[0] for frame in self.frames)
+        _, children = self.frames.pop()
+        if self.frames:
+            self.frames[-1][1] += wall
+        _recorder.record(stack, wall, wall - children, cpu, blocks, self.started)
+        return False
+
+
+def enable(path: str):
+    """Start recording spans to `path` (JSONL, or collapsed stacks for *.folded)"""
+    global enabled, _recorder
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = _Recorder(path)
+    enabled = True
+
+
+def span(name: str):
+    """Context manager timing a block (a shared no-op when profiling is off)"""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def profiled(name=None):
+    """
+    Decorator timing every call of a function
+
+    Use as @profiled or @profiled("label"); the label defaults to
+    module.qualname. Returns the function unchanged when profiling is off.
+    """
+    def decorate(fn: Callable) -> Callable:
+        if not enabled:
+            return fn
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    if callable(name):
+        fn, name = name, None
+        return decorate(fn)
+    return decorate
+
+
+def write_folded(stacks: Dict[str, int], path: str):
+    with open(path, 'w') as f:
+        for stack, micros in sorted(stacks.items()):
+            f.write(f"{stack} {micros}\n")
+
+
+def load_trace(path: str):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(records) -> Dict[str, Dict]:
+    """Per-name totals: calls, wall/self/cpu ms and allocated blocks"""
+    totals: Dict[str, Dict] = {}
+    for r in records:
+        t = totals.setdefault(r["name"], {"calls": 0, "wall_ms": 0.0, "self_ms": 0.0,
+                                          "cpu_ms": 0.0, "alloc_blocks": 0})
+        t["calls"] += 1
+        for key in ("wall_ms", "self_ms", "cpu_ms", "alloc_blocks"):
+            t[key] += r[key]
+    return totals
+
+
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: profiling.py <trace.jsonl> [--folded out.folded]")
+        sys.exit(1)
+
+    records = load_trace(sys.argv[1])
+    totals = summarize(records)
+    print(f"{'Span':<44} {'Calls':>7} {'Wall ms':>10} {'Self ms':>10} {'CPU ms':>10} {'Blocks':>9}")
+    for name, t in sorted(totals.items(), key=lambda item: -item[1]["self_ms"]):
+        print(f"{name:<44} {t['calls']:7d} {t['wall_ms']:10.2f} {t['self_ms']:10.2f} "
+              f"{t['cpu_ms']:10.2f} {t['alloc_blocks']:9d}")
+
+    if "--folded" in sys.argv:
+        out = sys.argv[sys.argv.index("--folded") + 1]
+        stacks: Dict[str, int] = {}
+        for r in records:
+            stacks[r["stack"]] = stacks.get(r["stack"], 0) + int(r["self_ms"] * 1000)
+        write_folded(stacks, out)
+        print(f"✓ Saved: {out}")
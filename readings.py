@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Helpers for [timestamp, value] reading lists.
+
+The MCP tools return readings as ISO timestamps with a Z suffix. These helpers
+convert whole lists to numpy arrays in one pass instead of calling
+datetime.fromisoformat per reading.
+"""
+
+import numpy as np
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from profiling import profiled
+
+
+@profiled("readings.parse_timestamps")
+def parse_timestamps(timestamps) -> np.ndarray:
+    """
+    Parse ISO timestamps into a datetime64[s] array (UTC)
+
+    Args:
+        timestamps: Sequence of ISO strings ('...Z', '...+00:00' or naive UTC)
+                    or datetimes
+
+    Returns:
+        numpy datetime64[s] array
+    """
+    if isinstance(timestamps, np.ndarray) and np.issubdtype(timestamps.dtype, np.datetime64):
+        return timestamps.astype('datetime64[s]')
+    stamps = list(timestamps)
+    if not stamps:
+        return np.empty(0, dtype='datetime64[s]')
+    if isinstance(stamps[0], datetime):
+        return np.array([_utc_naive(t) for t in stamps], dtype='datetime64[s]')
+
+    fixed = _parse_fixed_utc(stamps)
+    if fixed is not None:
+        return fixed
+    arr = np.asarray(stamps, dtype=str)
+    if np.all(np.char.endswith(arr, 'Z')):
+        # numpy parses the UTC 'Z' form once the suffix is removed
+        return np.char.rstrip(arr, 'Z').astype('datetime64[s]')
+    return np.array([_utc_naive(datetime.fromisoformat(t.replace('Z', '+00:00'))) for t in stamps],
+                    dtype='datetime64[s]')
+
+
+# 'YYYY-MM-DDTHH:MM:SSZ': digit positions and separators
+_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_SEPARATORS = np.frombuffer(b'--T::Z', dtype=np.uint8)
+
+
+def _parse_fixed_utc(stamps):
+    """
+    Fast path for the server's fixed-width 'YYYY-MM-DDTHH:MM:SSZ' format:
+    decode the digits arithmetically instead of parsing strings one by one.
+    Returns None if any timestamp has a different shape or an out-of-range
+    field, so those go to the general parser (which raises for invalid dates).
+    """
+    try:
+        raw = np.array(stamps, dtype='S')
+    except UnicodeEncodeError:
+        return None
+    if raw.dtype.itemsize != 20:
+        return None
+    chars = raw.view(np.uint8).reshape(-1, 20)
+    if not np.array_equal(chars[:, [4, 7, 10, 13, 16, 19]],
+                          np.broadcast_to(_SEPARATORS, (chars.shape[0], 6))):
+        return None
+    digits = chars[:, _DIGITS].astype(np.int32) - 48
+    if digits.min() < 0 or digits.max() > 9:
+        return None
+    pairs = digits[:, 0::2] * 10 + digits[:, 1::2]
+    year = pairs[:, 0] * 100 + pairs[:, 1]
+    month, day, hour, minute, second = pairs[:, 2:].T.astype(np.int64)
+    if (month.min() < 1 or month.max() > 12 or day.min() < 1 or hour.max() > 23
+            or minute.max() > 59 or second.max() > 59):
+        return None
+    months = (year - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1).astype('timedelta64[M]')
+    month_days = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+    if np.any(day > month_days):
+        return None
+    seconds = (day - 1) * 86400 + hour * 3600 + minute * 60 + second
+    return months.astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+
+
+def _utc_naive(t: datetime) -> datetime:
+    if t.tzinfo is not None:
+        t = t.astimezone(timezone.utc).replace(tzinfo=None)
+    return t
+
+
+def to_arrays(readings: List[Tuple[str, float]], sort: bool = True):
+    """
+    Split readings into (timestamps, values) numpy arrays
+
+    Args:
+        readings: List of [timestamp, value] pairs
+        sort: Sort by timestamp (stable)
+
+    Returns:
+        (datetime64[s] array, value array)
+    """
+    if not readings:
+        return np.empty(0, dtype='datetime64[s]'), np.empty(0)
+    times = parse_timestamps([r[0] for r in readings])
+    values = np.asarray([r[1] for r in readings])
+    if sort and times.size > 1 and np.any(times[1:] < times[:-1]):
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[order]
+    return times, values
+
+
+def to_epoch_seconds(times: np.ndarray) -> np.ndarray:
+    """datetime64 array -> float64 seconds since the epoch"""
+    return times.astype('datetime64[s]').astype(np.int64).astype(np.float64)
+
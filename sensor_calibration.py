@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Moisture sensor calibration profiles
+
+Each profile maps raw 12-bit ADC readings (0-4095) to moisture percentage
+(100% = wet, 0% = dry), either linearly between a wet and a dry reference or
+piecewise-linearly through measured calibration points. A profile compiles to
+a 4096-entry lookup table once, so converting readings is a table lookup:
+a list index for single values, one numpy take() for arrays or a whole fleet.
+
+Default calibration:
+- 1100 = immersed in water (saturated)
+- 3400 = dry air (completely dry)
+
+Profiles file format (JSON):
+    {
+      "sensor_a": {"wet": 1100, "dry": 3400},
+      "sensor_b": {"points": [[1050, 100], [1900, 70], [2600, 30], [3350, 0]]},
+      "sensors": {"plant-1": "sensor_a"}
+    }
+"""
+
+import sys
+import json
+from typing import List, Tuple, Dict, Optional
+
+ADC_SIZE = 4096
+
+SENSOR_WET = 1100
+SENSOR_DRY = 3400
+
+
+class CalibrationProfile:
+    """Raw ADC -> moisture % conversion compiled into a lookup table"""
+
+    def __init__(self, name: str, points: List[Tuple[float, float]]):
+        """
+        Args:
+            name: Profile name
+            points: (raw_value, moisture_pct) calibration points; readings
+                    outside the first/last point clamp to their percentage
+        """
+        if len(points) < 2:
+            raise ValueError(f"Profile '{name}' needs at least 2 calibration points")
+        self.name = name
+        self.points = sorted((float(raw), float(pct)) for raw, pct in points)
+        if len({raw for raw, _ in self.points}) != len(self.points):
+            raise ValueError(f"Profile '{name}' has duplicate raw values")
+        self._table = None
+        self._array = None
+
+    @classmethod
+    def linear(cls, name: str, wet: float = SENSOR_WET, dry: float = SENSOR_DRY) -> "CalibrationProfile":
+        """Two-point profile: wet reference = 100%, dry reference = 0%"""
+        return cls(name, [(wet, 100.0), (dry, 0.0)])
+
+    @property
+    def table(self) -> List[float]:
+        """4096-entry moisture % table, compiled on first use"""
+        if self._table is None:
+            self._table = self._compile()
+        return self._table
+
+    def _compile(self) -> List[float]:
+        table = []
+        seg = 0
+        last = len(self.points) - 1
+        for raw in range(ADC_SIZE):
+            if raw <= self.points[0][0]:
+                table.append(self.points[0][1])
+                continue
+            if raw >= self.points[last][0]:
+                table.append(self.points[last][1])
+                continue
+            while self.points[seg + 1][0] < raw:
+                seg += 1
+            (x0, y0), (x1, y1) = self.points[seg], self.points[seg + 1]
+            t = (raw - x0) / (x1 - x0)
+            table.append(y0 * (1 - t) + y1 * t)
+        return table
+
+    def table_array(self):
+        """Lookup table as a float64 numpy array (numpy is only imported here)"""
+        if self._array is None:
+            import numpy as np
+            self._array = np.asarray(self.table, dtype=np.float64)
+        return self._array
+
+    def to_percentage(self, value) -> float:
+        """
+        Convert one raw reading to moisture percentage (100% = wet, 0% = dry)
+
+        Fractional readings (averaged or filtered values) are interpolated
+        between the two neighbouring table entries.
+        """
+        table = self.table
+        if isinstance(value, int):
+            return table[min(max(value, 0), ADC_SIZE - 1)]
+        x = min(max(float(value), 0.0), ADC_SIZE - 1.0)
+        i = int(x)
+        if i == x:
+            return table[i]
+        return table[i] + (table[i + 1] - table[i]) * (x - i)
+
+    def to_dryness(self, value) -> float:
+        """Convert one raw reading to dryness percentage (0% = wet, 100% = dry)"""
+        return 100.0 - self.to_percentage(value)
+
+    def convert(self, values):
+        """Convert an array of raw readings to moisture percentages in one take() (interp() for floats)"""
+        import numpy as np
+        values = np.asarray(values)
+        if np.issubdtype(values.dtype, np.floating):
+            return np.interp(values, np.arange(ADC_SIZE), self.table_array())
+        raw = np.clip(values, 0, ADC_SIZE - 1).astype(np.intp, copy=False)
+        return np.take(self.table_array(), raw)
+
+    def to_dict(self) -> Dict:
+        return {"points": [[raw, pct] for raw, pct in self.points]}
+
+
+class CalibrationRegistry:
+    """Named calibration profiles plus the sensor -> profile assignment"""
+
+    def __init__(self, default: Optional[CalibrationProfile] = None):
+        self.default = default or CalibrationProfile.linear("default")
+        self.profiles: Dict[str, CalibrationProfile] = {self.default.name: self.default}
+        self.sensors: Dict[str, str] = {}
+        self._fleet = None
+
+    def add_profile(self, profile: CalibrationProfile) -> CalibrationProfile:
+        self.profiles[profile.name] = profile
+        self._fleet = None
+        return profile
+
+    def assign(self, sensor_id: str, profile_name: str):
+        """Use the named profile for readings from sensor_id"""
+        if profile_name not in self.profiles:
+            raise KeyError(f"Unknown calibration profile: {profile_name}")
+        self.sensors[sensor_id] = profile_name
+
+    def get(self, name_or_sensor: Optional[str] = None) -> CalibrationProfile:
+        """Look up a profile by profile name or sensor id (default if unknown)"""
+        if name_or_sensor is None:
+            return self.default
+        if name_or_sensor in self.profiles:
+            return self.profiles[name_or_sensor]
+        return self.profiles.get(self.sensors.get(name_or_sensor), self.default)
+
+    def convert_fleet(self, sensor_ids, values):
+        """
+        Convert readings from many sensors at once
+
+        Args:
+            sensor_ids: Sequence of sensor ids (or profile names), one per reading
+            values: Raw readings, same length as sensor_ids
+
+        Returns:
+            numpy array of moisture percentages
+        """
+        import numpy as np
+        if self._fleet is None:
+            names = list(self.profiles)
+            stacked = np.stack([self.profiles[n].table_array() for n in names])
+            self._fleet = ({n: i for i, n in enumerate(names)}, stacked.ravel())
+        index, flat = self._fleet
+
+        default_row = index[self.default.name]
+        ids, inverse = np.unique(np.asarray(sensor_ids), return_inverse=True)
+        rows = np.array([index.get(self.get(str(s)).name, default_row) for s in ids], dtype=np.intp)
+        raw = np.clip(np.asarray(values), 0, ADC_SIZE - 1).astype(np.intp, copy=False)
+        return np.take(flat, rows[inverse.ravel()] * ADC_SIZE + raw)
+
+    def to_dict(self) -> Dict:
+        data = {name: p.to_dict() for name, p in self.profiles.items()}
+        data["sensors"] = dict(self.sensors)
+        return data
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def load_profiles(path: str) -> CalibrationRegistry:
+    """Load a CalibrationRegistry from a JSON profiles file"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    registry = CalibrationRegistry()
+    sensors = data.pop("sensors", {})
+    for name, spec in data.items():
+        if "points" in spec:
+            registry.add_profile(CalibrationProfile(name, spec["points"]))
+        else:
+            registry.add_profile(CalibrationProfile.linear(name, spec["wet"], spec["dry"]))
+    if "default" in data:
+        registry.default = registry.profiles["default"]
+    for sensor_id, profile_name in sensors.items():
+        registry.assign(sensor_id, profile_name)
+    return registry
+
+
+DEFAULT_PROFILE = CalibrationProfile.linear("default", SENSOR_WET, SENSOR_DRY)
+
+
+if __name__ == "__main__":
+    # Usage: sensor_calibration.py [profiles.json] [profile_name]
+    registry = load_profiles(sys.argv[1]) if len(sys.argv) > 1 else CalibrationRegistry(DEFAULT_PROFILE)
+    profile = registry.get(sys.argv[2] if len(sys.argv) > 2 else None)
+
+    print(f"Profile: {profile.name}")
+    print(f"Points: {profile.points}")
+    for value in [1100, 1500, 1800, 2000, 2200, 2500, 2800, 3400]:
+        print(f"  {value:4d} -> {profile.to_percentage(value):5.1f}% moisture")
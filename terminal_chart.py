@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Min/max-binned terminal chart renderer for long moisture histories.
+
+Each chart column covers an equal slice of time. All readings are binned in
+one vectorized pass (min, max and last value per column) and drawn as a
+vertical range bar with the column's last reading marked, so spread within a
+column stays visible. Rows are built as whole strings and the chart is
+returned as one string, so a year of minute data renders in milliseconds.
+"""
+
+import sys
+import json
+import numpy as np
+from typing import Dict
+
+from readings import to_arrays, to_epoch_seconds
+from profiling import profiled
+
+RANGE_CHAR = '│'
+LAST_CHAR = '*'
+
+
+def bin_columns(seconds: np.ndarray, values: np.ndarray, width: int) -> Dict[str, np.ndarray]:
+    """
+    Bin time-sorted readings into `width` equal-time columns
+
+    Args:
+        seconds: Sorted epoch seconds
+        values: Readings aligned with seconds
+        width: Number of columns
+
+    Returns:
+        dict of per-column arrays: present (bool), min, max, last
+    """
+    span = seconds[-1] - seconds[0]
+    if span > 0:
+        cols = ((seconds - seconds[0]) * ((width - 1) / span)).astype(np.intp)
+    else:
+        cols = np.zeros(seconds.size, dtype=np.intp)
+
+    # Columns are non-decreasing, so each occupied column is one contiguous run
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+    ends = np.r_[starts[1:], cols.size]
+    occupied = cols[starts]
+
+    present = np.zeros(width, dtype=bool)
+    col_min = np.zeros(width, dtype=values.dtype)
+    col_max = np.zeros(width, dtype=values.dtype)
+    col_last = np.zeros(width, dtype=values.dtype)
+    present[occupied] = True
+    col_min[occupied] = np.minimum.reduceat(values, starts)
+    col_max[occupied] = np.maximum.reduceat(values, starts)
+    col_last[occupied] = values[ends - 1]
+    return {"present": present, "min": col_min, "max": col_max, "last": col_last}
+
+
+def render_range_chart(readings, height: int = 15, width: int = 60) -> str:
+    """
+    Render readings as a min/max range chart
+
+    Args:
+        readings: List of [timestamp, value] pairs
+        height: Chart height in characters
+        width: Chart width in characters
+
+    Returns:
+        The chart, header and axis as a single string
+    """
+    times, values = to_arrays(readings)
+    return render_arrays(times, values, height=height, width=width)
+
+
+@profiled("chart.render_arrays")
+def render_arrays(times: np.ndarray, values: np.ndarray, height: int = 15, width: int = 60) -> str:
+    """Render already-parsed, time-sorted datetime64 / value arrays (see render_range_chart)"""
+    if times.size < 2:
+        return "Insufficient data for chart\n"
+
+    bins = bin_columns(to_epoch_seconds(times), values, width)
+    min_val = values.min()
+    max_val = values.max()
+    value_range = max_val - min_val if max_val > min_val else 1
+
+    def to_row(v):
+        return height - 1 - ((v - min_val) * (height - 1) // value_range).astype(np.intp)
+
+    top = to_row(bins["max"])
+    bottom = to_row(bins["min"])
+    last = to_row(bins["last"])
+
+    rows = np.arange(height)[:, None]
+    present = bins["present"][None, :]
+    grid = np.full((height, width), ' ', dtype='<U1')
+    grid[(rows >= top) & (rows <= bottom) & present] = RANGE_CHAR
+    grid[(rows == last) & present] = LAST_CHAR
+
+    start_day = str(times[0].astype('datetime64[D]'))
+    end_day = str(times[-1].astype('datetime64[D]'))
+    lines = [
+        "",
+        f"Moisture Trend: {start_day} to {end_day}",
+        f"Range: {min_val} - {max_val} (span: {max_val - min_val})",
+        f"Current: {values[-1]}",
+        "",
+    ]
+    row_text = [''.join(row) for row in grid.tolist()]
+    for i, text in enumerate(row_text):
+        if i == 0:
+            prefix = f"{max_val:4.0f} ┤"
+        elif i == height - 1:
+            prefix = f"{min_val:4.0f} ┤"
+        else:
+            prefix = "     │"
+        lines.append(prefix + text)
+    lines.append("     └" + "─" * width)
+    lines.append(f"     {start_day[5:]}{'':>{width-10}}{end_day[5:]}")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r') as f:
+            data = json.load(f)
+    else:
+        data = json.load(sys.stdin)
+
+    sys.stdout.write(render_range_chart(data))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution thumbnail pyramid for archived photos.
+
+Each photo gets 1/2, 1/4 and 1/8 scale copies, built once. The JPEG is
+decoded straight to 1/2 scale (libjpeg DCT scaling through PIL draft mode)
+and each smaller level is a 2x box reduction of the previous one, so the
+whole pyramid costs less than one full-resolution decode.
+
+ThumbnailWorker builds pyramids on a background thread so ingest never
+waits for them; pick_level() returns the smallest level that is at least a
+requested width.
+
+Usage:
+    python thumbnail_pyramid.py <photo.jpg> <out_dir>
+"""
+
+import os
+import sys
+import queue
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from profiling import profiled
+
+LEVELS = (2, 4, 8)
+QUALITY = 85
+
+
+def level_path(directory: str, sha: str, scale: int) -> str:
+    return os.path.join(directory, sha[:2], f"{sha}_{scale}.jpg")
+
+
+@profiled("image.build_pyramid")
+def build_pyramid(source: str, directory: str, sha: str, levels=LEVELS) -> Dict[int, str]:
+    """
+    Write the pyramid levels for one photo
+
+    Args:
+        source: Original JPEG path
+        directory: Pyramid root directory
+        sha: Photo content hash (names the files)
+        levels: Scale denominators, ascending
+
+    Returns:
+        dict of scale -> written path
+    """
+    from PIL import Image
+
+    os.makedirs(os.path.join(directory, sha[:2]), exist_ok=True)
+    written = {}
+    with Image.open(source) as img:
+        full_size = img.size
+        img.draft('RGB', (full_size[0] // levels[0], full_size[1] // levels[0]))
+        current = img.convert('RGB')
+        scale = full_size[0] // current.width if current.width else 1
+        for target in levels:
+            if target > scale:
+                current = current.reduce(target // scale)
+                scale = target
+            path = level_path(directory, sha, target)
+            tmp = f"{path}.tmp"
+            current.save(tmp, 'JPEG', quality=QUALITY)
+            os.replace(tmp, path)
+            written[target] = path
+    return written
+
+
+def pick_level(directory: str, sha: str, min_width: int, full_width: int, levels=LEVELS) -> Optional[str]:
+    """
+    Smallest existing level at least `min_width` pixels wide
+
+    Returns None when no built level is big enough (use the original).
+    """
+    for scale in sorted(levels, reverse=True):
+        if full_width // scale >= min_width:
+            path = level_path(directory, sha, scale)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+class ThumbnailWorker:
+    """Background thread that builds pyramids for newly archived photos"""
+
+    def __init__(self, directory: str, index_path: Optional[str] = None):
+        """
+        Args:
+            directory: Pyramid root directory
+            index_path: Archive index DB; the photo's thumbnail column is set
+                        to its smallest level once built
+        """
+        self.directory = directory
+        self.index_path = index_path
+        self.errors: List[str] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._work, daemon=True, name="thumbnail-pyramid")
+        self._thread.start()
+
+    def submit(self, sha: str, source: str):
+        self._queue.put((sha, source))
+
+    def join(self):
+        """Wait until every submitted pyramid is built"""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _work(self):
+        conn = sqlite3.connect(self.index_path, timeout=30) if self.index_path else None
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                sha, source = item
+                try:
+                    written = build_pyramid(source, self.directory, sha)
+                except Exception as e:
+                    self.errors.append(f"{sha}: {e}")
+                    continue
+                if conn is not None:
+                    smallest = os.path.relpath(written[max(written)], os.path.dirname(self.index_path))
+                    with conn:
+                        conn.execute("UPDATE photos SET thumbnail = ? WHERE sha256 = ?", (smallest, sha))
+            finally:
+                self._queue.task_done()
+        if conn is not None:
+            conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: thumbnail_pyramid.py <photo.jpg> <out_dir>")
+        sys.exit(1)
+
+    import hashlib
+    with open(sys.argv[1], 'rb') as f:
+        sha = hashlib.sha256(f.read()).hexdigest()
+    for scale, path in build_pyramid(sys.argv[1], sys.argv[2], sha).items():
+        print(f"✓ Saved 1/{scale}: {path}")
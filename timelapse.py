@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Streaming time-lapse builder over the photo archive.
+
+Frames are pulled one at a time from the archive (smallest pyramid level
+that fits the frame), optionally lit-only and with near-duplicates skipped,
+and written out immediately:
+
+- animated GIF: the header and a shared palette come from the first frame,
+  then each frame is quantized to that palette and appended to the file
+  (PIL's save_all would keep every frame in memory until the end)
+- animated WebP: each frame goes straight into libwebp's animation encoder,
+  which keeps only the compressed frames until the file is assembled
+- image sequence: numbered JPEGs in a directory
+- montage: a contact sheet of at most MONTAGE_MAX_TILES frames spaced evenly
+  over the range, pasted into a preallocated canvas
+
+Memory stays at one frame (plus the montage canvas) however many months of
+captures go in. With a FrameCache (--cache) frames decoded by an earlier run
+are reused.
+
+Usage:
+    python timelapse.py <out.gif|out.webp|out_dir/|out.jpg> [archive_dir] [--all] [--width N] [--cache]
+"""
+
+import os
+import sys
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from perceptual_hash import skip_similar, SIMILAR_BITS
+
+FRAME_WIDTH = 480
+FRAME_DURATION_MS = 200
+MONTAGE_COLUMNS = 6
+MONTAGE_MAX_TILES = 60   # 6 x 10 tiles: ~2880 x 2700 px at the default width
+
+
+def select_photos(archive, lit_only: bool = True,
+                  skip_similar_bits: Optional[int] = SIMILAR_BITS) -> List[Dict]:
+    """
+    Index rows of the frames to use, oldest first (no image is opened)
+
+    Args:
+        archive: PhotoArchive
+        lit_only: Only photos classified as light ON
+        skip_similar_bits: Skip frames this close to the previous one (None: keep all)
+    """
+    photos = [p for p in archive.all(light_state="ON" if lit_only else None) if p.get("width")]
+    if skip_similar_bits is not None:
+        photos = list(skip_similar(photos, max_bits=skip_similar_bits))
+    return photos
+
+
+def spread(photos: List[Dict], count: int) -> List[Dict]:
+    """At most `count` photos spaced evenly from the first to the last"""
+    if len(photos) <= count:
+        return photos
+    if count <= 1:
+        return photos[:count]
+    return [photos[i * (len(photos) - 1) // (count - 1)] for i in range(count)]
+
+
+def iter_frames(archive, photos: List[Dict], width: int = FRAME_WIDTH,
+                label: bool = True, cache=None) -> Iterator[Tuple[Dict, "Image.Image"]]:
+    """
+    Yield (photo, RGB frame) one at a time
+
+    Args:
+        archive: PhotoArchive the photos belong to
+        photos: Rows from select_photos()
+        width: Frame width (height keeps the photo's aspect ratio)
+        label: Stamp the capture time in the corner
+        cache: Optional FrameCache for the decoded frames
+    """
+    from PIL import Image, ImageDraw
+
+    for photo in photos:
+        height = photo["height"] * width // photo["width"]
+        if cache is not None:
+            frame = Image.fromarray(cache.frame(archive.level(photo, width), width, photo["sha256"]))
+        else:
+            with Image.open(archive.level(photo, width)) as img:
+                img.draft('RGB', (width, height))
+                frame = img.convert('RGB')
+        if frame.size != (width, height):
+            frame = frame.resize((width, height), Image.BILINEAR)
+        if label:
+            ImageDraw.Draw(frame).text((6, height - 16), photo["captured_at"].replace('T', ' ')[:16],
+                                       fill=(255, 255, 255))
+        yield photo, frame
+
+
+class StreamingGifWriter:
+    """Append frames to an animated GIF as they arrive"""
+
+    def __init__(self, path: str, duration_ms: int = FRAME_DURATION_MS, loop: int = 0):
+        self.path = path
+        self.duration_ms = duration_ms
+        self.loop = loop
+        self.frames = 0
+        self._file = None
+        self._palette = None
+        self._size = None
+
+    def add(self, frame):
+        from PIL import Image, GifImagePlugin
+
+        if self._file is None:
+            # Palette from the first frame, shared by all frames (one global colour table)
+            self._palette = frame.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+            self._size = frame.size
+            self._file = open(self.path, 'wb')
+            header, _ = GifImagePlugin.getheader(self._palette, info={"loop": self.loop})
+            for chunk in header:
+                self._file.write(chunk)
+        if frame.size != self._size:
+            frame = frame.resize(self._size)
+        indexed = frame.quantize(palette=self._palette, dither=Image.Dither.NONE)
+        for chunk in GifImagePlugin.getdata(indexed, duration=self.duration_ms, loop=self.loop):
+            self._file.write(chunk)
+        self.frames += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.write(b";")
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamingWebpWriter:
+    """Feed frames to an animated WebP encoder as they arrive"""
+
+    def __init__(self, path: str, duration_ms: int = FRAME_DURATION_MS, loop: int = 0, quality: int = 80):
+        self.path = path
+        self.duration_ms = duration_ms
+        self.loop = loop
+        self.quality = quality
+        self.frames = 0
+        self._encoder = None
+        self._size = None
+
+    def add(self, frame):
+        # The encoder PIL's own save_all drives, fed one frame at a time
+        from PIL import _webp
+
+        if self._encoder is None:
+            self._size = frame.size
+            # size, background (ARGB), loop, minimize_size, kmin, kmax, allow_mixed, verbose
+            self._encoder = _webp.WebPAnimEncoder(self._size, 0, self.loop, False, 3, 5, False, False)
+        if frame.size != self._size:
+            frame = frame.resize(self._size)
+        self._encoder.add(frame.convert('RGB').getim(), self.frames * self.duration_ms,
+                          False, self.quality, 100, 0)
+        self.frames += 1
+
+    def close(self):
+        if self._encoder is not None:
+            self._encoder.add(None, self.frames * self.duration_ms, False, self.quality, 100, 0)
+            data = self._encoder.assemble(b"", b"", b"")
+            self._encoder = None
+            if data is None:
+                raise OSError(f"WebP encoder failed for {self.path}")
+            with open(self.path, 'wb') as f:
+                f.write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_gif(frames, path: str, duration_ms: int = FRAME_DURATION_MS) -> int:
+    with StreamingGifWriter(path, duration_ms) as writer:
+        for _, frame in frames:
+            writer.add(frame)
+    return writer.frames
+
+
+def write_webp(frames, path: str, duration_ms: int = FRAME_DURATION_MS) -> int:
+    with StreamingWebpWriter(path, duration_ms) as writer:
+        for _, frame in frames:
+            writer.add(frame)
+    return writer.frames
+
+
+def write_sequence(frames, directory: str, quality: int = 85) -> int:
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for count, (_, frame) in enumerate(frames, 1):
+        frame.save(os.path.join(directory, f"frame_{count:05d}.jpg"), quality=quality)
+    return count
+
+
+def write_montage(frames, path: str, count: int, tile_size: Tuple[int, int],
+                  columns: int = MONTAGE_COLUMNS, quality: int = 85,
+                  max_tiles: int = MONTAGE_MAX_TILES) -> int:
+    """
+    Paste up to `count` frames into a grid; only the canvas is kept in memory
+
+    The grid never exceeds max_tiles, so the canvas stays a fixed size (and
+    under JPEG's 65535 px limit) however long the history is; pick the frames
+    with spread() to cover the whole range.
+    """
+    from PIL import Image
+
+    count = min(count, max_tiles)
+    rows = max(-(-count // columns), 1)
+    canvas = Image.new('RGB', (tile_size[0] * min(columns, max(count, 1)), tile_size[1] * rows))
+    pasted = 0
+    # islice stops before the generator decodes a frame past the last tile
+    for pasted, (_, frame) in enumerate(islice(frames, count), 1):
+        i = pasted - 1
+        if frame.size != tile_size:
+            frame = frame.resize(tile_size)
+        canvas.paste(frame, ((i % columns) * tile_size[0], (i // columns) * tile_size[1]))
+    canvas.save(path, quality=quality)
+    return pasted
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    width = FRAME_WIDTH
+    if "--width" in args:
+        i = args.index("--width")
+        width = int(args[i + 1])
+        del args[i:i + 2]
+    lit_only = "--all" not in args
+    args = [a for a in args if not a.startswith('--')]
+    if not args:
+        print("Usage: timelapse.py <out.gif|out.webp|out_dir/|out.jpg> [archive_dir] [--all] [--width N] [--cache]")
+        sys.exit(1)
+    out = args[0]
+    cache = None
+    if "--cache" in sys.argv:
+        from frame_cache import FrameCache
+        cache = FrameCache()
+
+    from photo_archive import PhotoArchive, DEFAULT_ROOT
+    with PhotoArchive(args[1] if len(args) > 1 else DEFAULT_ROOT) as archive:
+        photos = select_photos(archive, lit_only)
+        if not photos:
+            print("No matching photos in the archive")
+            sys.exit(0)
+        frames = iter_frames(archive, photos, width=width, cache=cache)
+        if out.lower().endswith('.gif'):
+            written = write_gif(frames, out)
+        elif out.lower().endswith('.webp'):
+            written = write_webp(frames, out)
+        elif out.endswith('/') or os.path.isdir(out):
+            written = write_sequence(frames, out)
+        else:
+            photos = spread(photos, MONTAGE_MAX_TILES)
+            frames = iter_frames(archive, photos, width=width, cache=cache)
+            tile = (width, photos[0]["height"] * width // photos[0]["width"])
+            written = write_montage(frames, out, len(photos), tile)
+    print(f"✓ Saved: {out} ({written} frames)")
@@ -17,18 +17,18 @@ Current reading: ~2086 (as of 2025-10-30)
 Position: 43% from wet to dry
 """
 
+from sensor_calibration import DEFAULT_PROFILE, SENSOR_WET, SENSOR_DRY
+
 # Sensor calibration
-SENSOR_WET = 1100
-SENSOR_DRY = 3400
 SENSOR_RANGE = SENSOR_DRY - SENSOR_WET
 
-def calculate_dryness_percentage(sensor_value):
+def calculate_dryness_percentage(sensor_value, profile=DEFAULT_PROFILE):
     """
     Calculate how dry the soil is as a percentage.
     0% = completely wet (1100)
     100% = completely dry (3400)
     """
-    return ((sensor_value - SENSOR_WET) / SENSOR_RANGE) * 100
+    return profile.to_dryness(sensor_value)
 
 def interpret_moisture(sensor_value):
     """